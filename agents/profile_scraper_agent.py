@@ -1,11 +1,14 @@
-from crewai import Agent
-from langchain_mistralai.chat_models import ChatMistralAI
 import os
 import logging
-from typing import List, Dict, Any, Optional
-from ..utils.linkedin_scraper import LinkedInScraper
-from ..utils.vector_store import ProfileVectorStore
-from ..utils.rag_system import ProfileRAG
+from typing import List, Dict, Any, Optional, Iterator, Callable
+from utils.bulk_import import BulkImporter
+from utils.cache import PersistentCache
+from utils.embeddings import get_embedding_service
+from utils.linkedin_scraper import LinkedInScraper
+from utils.llm_cache import get_llm_cache
+from utils.llm_registry import get_llm
+from utils.vector_store import ProfileVectorStore
+from utils.rag_system import ProfileRAG
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,9 +19,30 @@ class ProfileScraperAgent:
         self.api_key = os.getenv("MISTRAL_API_KEY")
         self.rapidapi_key = os.getenv("RAPIDAPI_KEY")
         
+        # Persist embeddings so reruns for the same role skip the transformer
+        get_embedding_service(cache_dir="./data/cache/embeddings")
+        
         # Initialize components if API keys are available
         if self.rapidapi_key:
-            self.scraper = LinkedInScraper(api_key=self.rapidapi_key)
+            # Raw profiles change rarely, so keep them for a week on disk
+            profile_cache = PersistentCache(
+                "./data/cache/scraper_cache.sqlite3",
+                namespace="linkedin_profiles",
+                ttl=7 * 24 * 3600,
+                max_entries=50000
+            )
+            # Search results for a role/location barely move within a day
+            search_cache = PersistentCache(
+                "./data/cache/scraper_cache.sqlite3",
+                namespace="google_search",
+                ttl=24 * 3600,
+                max_entries=5000
+            )
+            self.scraper = LinkedInScraper(
+                api_key=self.rapidapi_key,
+                cache=profile_cache,
+                search_cache=search_cache
+            )
         else:
             logger.warning("RAPIDAPI_KEY not found. LinkedIn scraper will not work.")
             self.scraper = None
@@ -26,26 +50,34 @@ class ProfileScraperAgent:
         # Initialize vector store
         self.vector_store = ProfileVectorStore(
             collection_name="linkedin_profiles",
-            persist_directory="./data/chroma_db"
+            warm=True
         )
         
-        # Initialize RAG system if Mistral API key is available
-        if self.api_key:
-            self.rag = ProfileRAG(
+        # The RAG system (and its Mistral client) is built on first use, so
+        # collecting or importing profiles never loads the LLM stack
+        self._rag = None
+        if not self.api_key:
+            logger.warning("MISTRAL_API_KEY not found. RAG system will not work.")
+            
+    @property
+    def rag(self) -> Optional[ProfileRAG]:
+        """RAG system, constructed on first access (None without a Mistral API key)"""
+        if self._rag is None and self.api_key:
+            self._rag = ProfileRAG(
                 vector_store=self.vector_store,
-                api_key=self.api_key
+                api_key=self.api_key,
+                cache=get_llm_cache(),
+                # Exact skill tokens rank better with keyword + vector fusion
+                search_mode="hybrid"
             )
-        else:
-            logger.warning("MISTRAL_API_KEY not found. RAG system will not work.")
-            self.rag = None
+        return self._rag
             
     @staticmethod
     def agent(job_role=None):
         """Create a CrewAI agent for profile scraping"""
-        llm = ChatMistralAI(
-            api_key=os.getenv("MISTRAL_API_KEY"),
-            model="mistral/mistral-large-latest"
-        )
+        from crewai import Agent
+
+        llm = get_llm("mistral/mistral-large-latest")
         
         return Agent(
             role="Profile Scraper",
@@ -55,7 +87,8 @@ class ProfileScraperAgent:
             allow_delegation=False
         )
         
-    def collect_profiles(self, job_role: str, location: Optional[str] = None, num_results: int = 5) -> List[Dict[str, Any]]:
+    def collect_profiles(self, job_role: str, location: Optional[str] = None, num_results: int = 5,
+                         max_age: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Collect real LinkedIn profiles for a job role
         
@@ -63,6 +96,7 @@ class ProfileScraperAgent:
             job_role: The job role to search for
             location: Optional location filter
             num_results: Number of profiles to collect
+            max_age: Refetch cached profiles older than this many seconds
             
         Returns:
             List of collected profiles
@@ -76,18 +110,36 @@ class ProfileScraperAgent:
         
         # Collect profile details
         profiles = []
-        for username in usernames:
-            raw_profile = self.scraper.get_profile_details(username)
+        for raw_profile in self.scraper.get_profiles_details(usernames, max_age=max_age):
             if raw_profile:
-                processed_profile = self.scraper.process_profile(raw_profile)
+                # The vector store embeds only new or changed profiles
+                processed_profile = self.scraper.process_profile(raw_profile, embed=False)
                 profiles.append(processed_profile)
                 
-                # Add to vector store
-                self.vector_store.add_profile(processed_profile)
+        # Add to vector store in one batched write
+        self.vector_store.add_profiles(profiles)
                 
         return profiles
         
-    def analyze_candidates(self, job_role: str, job_description: str, n_results: int = 5) -> Dict[str, Any]:
+    def import_profiles(self, path: str, chunk_size: int = 1000, resume: bool = True,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Bulk import an XLSX/CSV/Parquet candidate export into the vector store
+        
+        Args:
+            path: Export file, e.g. data/sample_profiles.xlsx
+            chunk_size: Rows read and written per chunk
+            resume: Continue an interrupted import from its checkpoint
+            progress: Called after every chunk with the running totals
+            
+        Returns:
+            Import totals
+        """
+        importer = BulkImporter(self.vector_store, chunk_size=chunk_size, progress=progress)
+        return importer.import_file(path, resume=resume)
+        
+    def analyze_candidates(self, job_role: str, job_description: str, n_results: int = 5,
+                           mode: str = "stuff", filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze candidates using RAG
         
@@ -95,6 +147,8 @@ class ProfileScraperAgent:
             job_role: The job role to analyze
             job_description: Detailed job description
             n_results: Number of profiles to analyze
+            mode: "stuff" (single prompt) or "map_reduce" (per-profile calls plus a ranking call)
+            filters: Structured profile filters, e.g. {"location": "India", "min_years": 3}
             
         Returns:
             Analysis results
@@ -103,4 +157,24 @@ class ProfileScraperAgent:
             logger.error("RAG system not initialized. Cannot analyze candidates.")
             return {"error": "RAG system not initialized"}
             
-        return self.rag.analyze_candidates(job_role, job_description, n_results)
\ No newline at end of file
+        return self.rag.analyze_candidates(job_role, job_description, n_results, mode=mode, filters=filters)
+        
+    def stream_analysis(self, job_role: str, job_description: str, n_results: int = 5,
+                        filters: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream the candidate analysis as it is generated
+        
+        Args:
+            job_role: The job role to analyze
+            job_description: Detailed job description
+            n_results: Number of profiles to analyze
+            filters: Structured profile filters, e.g. {"location": "India", "min_years": 3}
+            
+        Yields:
+            Chunks of the analysis text
+        """
+        if not self.rag:
+            logger.error("RAG system not initialized. Cannot analyze candidates.")
+            return
+            
+        yield from self.rag.stream_analysis(job_role, job_description, n_results, filters=filters)
@@ -1,14 +1,11 @@
-from crewai import Agent
-from langchain_mistralai.chat_models import ChatMistralAI
-import os
+from utils.llm_registry import get_llm
 
 class ReportingAgent:
     @staticmethod
     def agent():
-        llm = ChatMistralAI(
-            api_key=os.getenv("MISTRAL_API_KEY"),
-            model="mistral/mistral-large-latest"
-        )
+        from crewai import Agent
+
+        llm = get_llm("mistral/mistral-large-latest")
         return Agent(
             role="HR Reporting Agent",
             goal="Generate recruitment reports and respond to HR queries.",
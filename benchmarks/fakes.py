@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from utils.rate_limit import RetryableError
+
+from .synthetic import SyntheticProfiles
+
+logger = logging.getLogger(__name__)
+
+
+class FakeRapidAPI:
+    def __init__(self, profiles: SyntheticProfiles, latency: float = 0.02, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        """
+        Local HTTP stand-in for the RapidAPI LinkedIn profile endpoint
+
+        Serves synthetic profiles for "candidate-<n>" usernames on
+        127.0.0.1; point LinkedInScraper(api_url=fake.url) at it.
+
+        Args:
+            profiles: Generator that answers requests
+            latency: Seconds each response is delayed
+            jitter: Extra uniform random delay of up to this many seconds
+            error_rate: Share of requests answered with 429 or 503
+            seed: Seed for jitter and error injection
+        """
+        self.profiles = profiles
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _respond(self, username: str):
+        """(status, headers, body) for one request"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < self.error_rate
+            status = self._rng.choice((429, 503)) if fail else 200
+            if fail:
+                self.errors += 1
+        time.sleep(delay)
+        if fail:
+            return status, {"Retry-After": "0"}, b"{}"
+        index = SyntheticProfiles.index_of(username)
+        if index is None:
+            return 404, {}, b"{}"
+        return 200, {}, json.dumps(self.profiles.raw_profile(index)).encode("utf-8")
+
+    def start(self) -> "FakeRapidAPI":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                username = parse_qs(urlparse(self.path).query).get("username", [""])[0]
+                status, headers, body = fake._respond(username)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-rapidapi", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeRapidAPI":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeMistralAPI:
+    def __init__(self, latency: float = 0.01):
+        """
+        Local HTTP stand-in for the Mistral chat completions endpoint
+
+        Lets a real ChatMistralAI client (and its pooled HTTP connections)
+        run offline; pass endpoint=fake.url when constructing it.
+
+        Args:
+            latency: Seconds each response is delayed
+        """
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _respond(self, payload: Dict[str, Any]) -> bytes:
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+        prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        message = FakeMistral._reply(prompt).generations[0].message
+        usage = message.usage_metadata
+        return json.dumps({
+            "id": f"fake-{self.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model", "fake-mistral"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": message.content}}],
+            "usage": {"prompt_tokens": usage["input_tokens"], "completion_tokens": usage["output_tokens"],
+                      "total_tokens": usage["total_tokens"]},
+        }).encode("utf-8")
+
+    def start(self) -> "FakeMistralAPI":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = fake._respond(json.loads(self.rfile.read(length) or b"{}"))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-mistral-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeMistralAPI":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeMistral(BaseChatModel):
+    """
+    Chat model with tunable latency and error rate in place of ChatMistralAI
+
+    Replies are derived from a hash of the prompt, so the same prompt always
+    gets the same answer. Injected errors are RetryableErrors with status 429,
+    exercising the same retry path as real rate limiting.
+    """
+
+    model: str = "fake-mistral"
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    _calls: Any = PrivateAttr(default_factory=itertools.count)
+    _stats_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"calls": 0, "errors": 0, "prompt_chars": 0})
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-mistral"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def _plan(self, messages: List[BaseMessage]):
+        """(delay, fail, prompt) for the next call"""
+        prompt = "\n".join(str(m.content) for m in messages)
+        call = next(self._calls)
+        rng = random.Random(f"{self.seed}:{call}")
+        fail = rng.random() < self.error_rate
+        with self._stats_lock:
+            self._stats["calls"] += 1
+            self._stats["prompt_chars"] += len(prompt)
+            if fail:
+                self._stats["errors"] += 1
+        return self.latency + rng.uniform(0, self.jitter), fail, prompt
+
+    @staticmethod
+    def _reply(prompt: str) -> ChatResult:
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest()
+        score = 1 + digest[0] % 10
+        text = json.dumps({
+            "score": score,
+            "strengths": "relevant experience and matching skills",
+            "weaknesses": "limited exposure to some preferred tools",
+            "fit": f"Synthetic evaluation with score {score}",
+        })
+        # Roughly four characters per token, like the real tokenizer on English text
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                 "total_tokens": (len(prompt) + len(text)) // 4}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay, fail, prompt = self._plan(messages)
+        time.sleep(delay)
+        if fail:
+            raise RetryableError("HTTP 429", status_code=429, retry_after=0)
+        return self._reply(prompt)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay, fail, prompt = self._plan(messages)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RetryableError("HTTP 429", status_code=429, retry_after=0)
+        return self._reply(prompt)
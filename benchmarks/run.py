@@ -0,0 +1,300 @@
+"""
+Offline benchmark suite
+
+Runs every benchmark against synthetic profiles, a local fake RapidAPI server
+and a fake Mistral model, and writes the results as JSON:
+
+    python -m benchmarks.run --profiles 1000 --output bench.json
+    python -m benchmarks.run --only vector_store,screening --llm-latency 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from utils.linkedin_scraper import LinkedInScraper
+from utils.metrics import metrics
+from utils.prefilter import CandidatePrefilter
+from utils.rag_system import ProfileRAG
+from utils.rate_limit import configure_rate_limiter
+from utils.screening import ScreeningEngine
+from utils.vector_store import ProfileVectorStore
+
+from .fakes import FakeMistral, FakeRapidAPI
+from .synthetic import HashingEmbedder, SyntheticProfiles
+
+logger = logging.getLogger(__name__)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """Latency summary in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(fn: Callable[[], Any]):
+    """(result, seconds) of one call"""
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+class BenchmarkSuite:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.generator = SyntheticProfiles(
+            seed=args.seed,
+            summary_words=(args.summary_words // 2, args.summary_words),
+            skills_per_profile=(max(1, args.skills // 3), args.skills),
+            skill_skew=args.skill_skew,
+        )
+        self.embedder = self._embedder()
+        self.workdir = tempfile.mkdtemp(prefix="hirely-bench-")
+        self.processed: List[Dict[str, Any]] = []
+        self.store: Any = None
+
+        # Measure our own code, not provider throttling
+        configure_rate_limiter("rapidapi", rate=args.upstream_rate, base_delay=0.01, max_delay=0.1)
+        configure_rate_limiter("mistral", rate=args.upstream_rate, base_delay=0.01, max_delay=0.1)
+
+    def _embedder(self):
+        if self.args.real_embeddings:
+            from utils.embeddings import get_embedding_service
+            return get_embedding_service()
+        return HashingEmbedder()
+
+    def _llm(self) -> FakeMistral:
+        return FakeMistral(latency=self.args.llm_latency, jitter=self.args.llm_jitter,
+                           error_rate=self.args.llm_error_rate, seed=self.args.seed)
+
+    def _ensure_store(self):
+        if self.store is None:
+            self.bench_vector_store()
+
+    def bench_process_profile(self) -> Dict[str, Any]:
+        """Fetch profiles from the fake RapidAPI and run process_profile on them"""
+        n = self.args.profiles
+        usernames = [SyntheticProfiles.username(i) for i in range(n)]
+        with FakeRapidAPI(self.generator, latency=self.args.api_latency, jitter=self.args.api_jitter,
+                          error_rate=self.args.api_error_rate, seed=self.args.seed) as api:
+            scraper = LinkedInScraper(api_key="benchmark", embedder=self.embedder, api_url=api.url,
+                                      max_workers=self.args.workers)
+            raw, fetch_seconds = timed(lambda: scraper.get_profiles_details(usernames))
+            scraper.close()
+            api_stats = {"requests": api.requests, "injected_errors": api.errors}
+
+        raw = [profile for profile in raw if profile]
+        samples = []
+        embedded_samples = []
+        for profile in raw:
+            _, seconds = timed(lambda: scraper.process_profile(profile, embed=False))
+            samples.append(seconds)
+            processed, seconds = timed(lambda: scraper.process_profile(profile, embed=True))
+            embedded_samples.append(seconds)
+            self.processed.append(processed)
+
+        return {
+            "fetch": {"profiles": n, "fetched": len(raw), "seconds": round(fetch_seconds, 4),
+                      "profiles_per_second": round(len(raw) / fetch_seconds, 2) if fetch_seconds else None,
+                      "retries": scraper.rate_limiter.retries, **api_stats},
+            "process_profile": summarize(samples),
+            "process_profile_embed": summarize(embedded_samples),
+        }
+
+    def bench_vector_store(self) -> Dict[str, Any]:
+        """Single and batched writes, then dense/bm25/hybrid and multi-query search"""
+        if self.processed:
+            # Drop precomputed embeddings so the writes include encoding
+            profiles = [{k: v for k, v in p.items() if k != "embedding"} for p in self.processed]
+        else:
+            scraper = LinkedInScraper(api_key="benchmark", embedder=self.embedder)
+            profiles = [scraper.process_profile(p, embed=False) for p in self.generator.raw_profiles(self.args.profiles)]
+            scraper.close()
+        store = ProfileVectorStore("bench_profiles", os.path.join(self.workdir, "chroma"), embedder=self.embedder)
+
+        single = profiles[:self.args.single_writes]
+        single_samples = [timed(lambda p=p: store.add_profile(p))[1] for p in single]
+        results, batch_seconds = timed(lambda: store.add_profiles(profiles[len(single):]))
+        statuses: Dict[str, int] = {}
+        for result in results:
+            statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        _, rewrite_seconds = timed(lambda: store.add_profiles(profiles))
+
+        queries = [f"{role} with skills matching: {description}"
+                   for role, description in self.generator.job_descriptions(self.args.queries)]
+        search = {}
+        for mode in ("dense", "bm25", "hybrid"):
+            search[mode] = summarize([timed(lambda q=q: store.search_profiles(q, self.args.top_k, mode=mode))[1]
+                                      for q in queries])
+        search["filtered_dense"] = summarize([
+            timed(lambda q=q: store.search_profiles(q, self.args.top_k, filters={"location": "India", "min_years": 2}))[1]
+            for q in queries
+        ])
+        _, many_seconds = timed(lambda: store.search_profiles_many(queries, self.args.top_k))
+
+        self.store = store
+        batched = len(profiles) - len(single)
+        return {
+            "add_profile": summarize(single_samples),
+            "add_profiles": {"profiles": batched, "seconds": round(batch_seconds, 4),
+                             "profiles_per_second": round(batched / batch_seconds, 2) if batch_seconds else None,
+                             "statuses": statuses},
+            "add_profiles_unchanged": {"profiles": len(profiles), "seconds": round(rewrite_seconds, 4)},
+            "search_profiles": search,
+            "search_profiles_many": {"queries": len(queries), "seconds": round(many_seconds, 4),
+                                     "per_query_ms": round(many_seconds / len(queries) * 1000, 3) if queries else None},
+        }
+
+    def bench_analyze_candidates(self) -> Dict[str, Any]:
+        """ProfileRAG in stuff and map_reduce modes against the fake model"""
+        self._ensure_store()
+        rag = ProfileRAG(self.store, api_key="benchmark", search_mode="hybrid")
+        rag.llm = self._llm()
+        jobs = self.generator.job_descriptions(self.args.jobs)
+        results = {}
+        for mode in ("stuff", "map_reduce"):
+            samples = []
+            failures = 0
+            for role, description in jobs:
+                result, seconds = timed(lambda: rag.analyze_candidates(role, description, n_results=self.args.top_k,
+                                                                       mode=mode, max_in_flight=self.args.workers))
+                samples.append(seconds)
+                failures += "error" in result
+            results[mode] = dict(summarize(samples), failures=failures)
+        results["llm"] = rag.llm.stats
+        return results
+
+    def bench_screening(self) -> Dict[str, Any]:
+        """Prefilter the whole store, then LLM-screen the shortlist concurrently"""
+        self._ensure_store()
+        llm = self._llm()
+        role, description = self.generator.job_descriptions(1)[0]
+        prefilter = CandidatePrefilter(self.embedder, top_k=self.args.shortlist)
+        shortlist, prefilter_seconds = timed(lambda: prefilter.shortlist_store(self.store, description))
+        engine = ScreeningEngine(llm, max_in_flight=self.args.workers, timeout=30)
+        retries_before = engine.rate_limiter.retries
+        screened, screen_seconds = timed(lambda: engine.screen(f"{role}: {description}", shortlist))
+        succeeded = sum(1 for r in screened if r["success"])
+        return {
+            "profiles": self.store.collection.count(),
+            "prefilter_seconds": round(prefilter_seconds, 4),
+            "shortlisted": len(shortlist),
+            "screen_seconds": round(screen_seconds, 4),
+            "screened_per_second": round(len(screened) / screen_seconds, 2) if screen_seconds else None,
+            "succeeded": succeeded,
+            "failed": len(screened) - succeeded,
+            "retries": engine.rate_limiter.retries - retries_before,
+            "llm": llm.stats,
+        }
+
+    BENCHMARKS = {
+        "process_profile": bench_process_profile,
+        "vector_store": bench_vector_store,
+        "analyze_candidates": bench_analyze_candidates,
+        "screening": bench_screening,
+    }
+
+    def run(self, only: Sequence[str]) -> Dict[str, Any]:
+        results = {}
+        try:
+            for name in only:
+                logger.info(f"Running benchmark {name}")
+                results[name], seconds = timed(lambda: self.BENCHMARKS[name](self))
+                results[name]["wall_seconds"] = round(seconds, 4)
+        finally:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks with synthetic profiles and fake upstreams")
+    parser.add_argument("--only", default=",".join(BenchmarkSuite.BENCHMARKS),
+                        help="Comma-separated benchmarks to run")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profiles", type=int, default=500, help="Synthetic profiles to generate")
+    parser.add_argument("--summary-words", type=int, default=80, help="Maximum words in a summary")
+    parser.add_argument("--skills", type=int, default=15, help="Maximum skills per profile")
+    parser.add_argument("--skill-skew", type=float, default=1.1, help="Zipf exponent of skill popularity")
+    parser.add_argument("--single-writes", type=int, default=50, help="Profiles written one by one with add_profile")
+    parser.add_argument("--queries", type=int, default=50, help="Search queries per mode")
+    parser.add_argument("--jobs", type=int, default=5, help="Job descriptions analyzed per RAG mode")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per search / analysis")
+    parser.add_argument("--shortlist", type=int, default=50, help="Prefilter survivors screened by the LLM")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches / LLM calls")
+    parser.add_argument("--api-latency", type=float, default=0.02)
+    parser.add_argument("--api-jitter", type=float, default=0.01)
+    parser.add_argument("--api-error-rate", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-jitter", type=float, default=0.02)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--upstream-rate", type=float, default=1000.0,
+                        help="Rate limit (requests/s) applied to the fake upstreams")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record instrumentation metrics and include them in the output")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use the sentence-transformers model instead of the hashing embedder")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    # Some modules configure INFO logging on import; keep benchmark output quiet
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+    args = parse_args(argv)
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in only if name not in BenchmarkSuite.BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    metrics.enabled = args.metrics
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+        },
+        "results": BenchmarkSuite(args).run(only),
+    }
+    if args.metrics:
+        report["metrics"] = metrics.snapshot()
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
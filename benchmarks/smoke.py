@@ -0,0 +1,339 @@
+"""
+Offline smoke checks
+
+Fast correctness checks for behaviour the timing benchmarks would not notice
+breaking. Runs against synthetic profiles, an in-memory Chroma client, a local
+Mistral endpoint and stand-in crewai/googlesearch modules:
+
+    python -m benchmarks.smoke
+    python -m benchmarks.smoke --only dedup_unrelated
+"""
+import argparse
+import copy
+import csv
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import traceback
+import types
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from utils.bulk_import import BulkImporter
+from utils.dedup import DuplicateDetector, shingles
+from utils.cache import PersistentCache
+from utils.rag_system import ProfileRAG
+from utils.linkedin_scraper import LinkedInScraper, google_search_backend
+from utils.llm_registry import get_llm
+from utils.profile_filters import title_words
+from utils.pipeline import PipelineRunner, Stage, profile_ingest_stages
+from utils.rate_limit import RateLimiter
+from utils.screening import ScreeningEngine
+from utils.vector_store import ProfileVectorStore
+
+from .fakes import FakeMistral, FakeMistralAPI, FakeRapidAPI
+from .synthetic import HashingEmbedder, SyntheticProfiles
+
+logger = logging.getLogger(__name__)
+
+
+def _processed(raw_profiles: List[Dict[str, Any]], embedder: HashingEmbedder) -> List[Dict[str, Any]]:
+    scraper = LinkedInScraper(api_key="smoke", embedder=embedder)
+    try:
+        return [scraper.process_profile(profile, embed=False) for profile in raw_profiles]
+    finally:
+        scraper.close()
+
+
+def _store(name: str, embedder: HashingEmbedder) -> ProfileVectorStore:
+    # In-memory, so every run starts from an empty collection
+    return ProfileVectorStore(collection_name=name, persist_directory=None, embedder=embedder)
+
+
+def _near_copy(raw: Dict[str, Any], username: str) -> Dict[str, Any]:
+    """The same person re-exported under another username with a light edit"""
+    duplicate = copy.deepcopy(raw)
+    duplicate["username"] = username
+    duplicate["summary"] = duplicate["summary"] + " Open to relocation."
+    return duplicate
+
+
+def check_dedup_unrelated():
+    """Distinct profiles get a low MinHash estimate and are never merged, named or not"""
+    embedder = HashingEmbedder()
+    generator = SyntheticProfiles(seed=11)
+    profiles = _processed(generator.raw_profiles(200), embedder)
+    detector = DuplicateDetector()
+    store = _store("smoke_dedup_unrelated", embedder)
+
+    documents = [store._create_profile_document(profile) for profile in profiles]
+    signatures = [detector.signature(document) for document in documents]
+    grams = [set(shingles(document)) for document in documents]
+    for i, j in itertools.combinations(range(len(profiles)), 2):
+        estimate = detector.similarity(signatures[i], signatures[j])
+        jaccard = len(grams[i] & grams[j]) / len(grams[i] | grams[j])
+        assert estimate < detector.threshold, f"{profiles[i]['username']} ~ {profiles[j]['username']}: {estimate:.2f}"
+        assert abs(estimate - jaccard) < 0.15, f"estimate {estimate:.2f} vs true Jaccard {jaccard:.2f}"
+
+    for profile in profiles:
+        profile["name"] = ""
+    statuses = [result["status"] for result in store.add_profiles(profiles)]
+    assert statuses.count("added") == len(profiles), f"merged distinct profiles: {statuses.count('duplicate')}"
+
+
+def check_dedup_merges_copies():
+    """A near-copy of a stored profile is merged and recorded on the canonical"""
+    embedder = HashingEmbedder()
+    raw = SyntheticProfiles(seed=12).raw_profile(0)
+    store = _store("smoke_dedup_copies", embedder)
+    original, = _processed([raw], embedder)
+    store.add_profiles([original])
+
+    # The canonical arrives unchanged in the same batch as its duplicate
+    copy_profile, = _processed([_near_copy(raw, "candidate-copy")], embedder)
+    results = store.add_profiles([original, copy_profile])
+    assert [r["status"] for r in results] == ["unchanged", "duplicate"], results
+    stored = store.collection.get(ids=[f"profile_{raw['username']}"], include=["metadatas"])["metadatas"][0]
+    assert "candidate-copy" in str(stored.get("merged_usernames") or ""), stored
+
+    # Re-ingesting the merged copy resolves it from the canonical's flag, without comparing text
+    with mock.patch.object(store.dedup, "closest", side_effect=AssertionError("text compared again")):
+        results = store.add_profiles([copy_profile])
+    assert [(r["status"], r["duplicate_of"]) for r in results] == [("duplicate", f"profile_{raw['username']}")], results
+
+
+def _stub_crewai() -> types.ModuleType:
+    """crewai stand-in whose Agent and Task just keep their keyword arguments"""
+    class Recorded:
+        def __init__(self, **kwargs: Any):
+            self.__dict__.update(kwargs)
+
+    crewai = types.ModuleType("crewai")
+    crewai.Agent = type("Agent", (Recorded,), {})
+    crewai.Task = type("Task", (Recorded,), {})
+    return crewai
+
+
+def check_crew_tasks():
+    """Every HRTasks task builds (with its agent and callback) once crewai loads lazily"""
+    crewai = _stub_crewai()
+    with mock.patch.dict(sys.modules, {"crewai": crewai}):
+        from tasks.hr_tasks import HRTasks
+
+        hr_tasks = HRTasks()
+        tasks = [
+            hr_tasks.handle_hr_query("Python developer in Kochi"),
+            hr_tasks.scrape_profiles("Python Developer"),
+            hr_tasks.screen_cvs("Python Developer"),
+            hr_tasks.communicate(),
+            hr_tasks.schedule_interviews(),
+            hr_tasks.generate_report(),
+        ]
+        for task in tasks:
+            assert isinstance(task, crewai.Task), type(task)
+            assert isinstance(task.agent, crewai.Agent), type(task.agent)
+            task.callback(None)
+        assert hr_tasks.profile_scraper_agent("Python Developer") is tasks[1].agent
+
+
+def _stub_googlesearch(corpus: List[str]) -> types.ModuleType:
+    """googlesearch stand-in reproducing how version 1.3.0 sizes and pages its requests"""
+    def search(term, num_results=10, lang="en", start_num=0, **kwargs):
+        start = start_num
+        fetched = 0
+        while fetched < num_results:
+            # googlesearch requests num_results - start + 2 results per page
+            page = corpus[start:start + max(num_results - start + 2, 0)]
+            new_results = 0
+            for link in page:
+                fetched += 1
+                new_results += 1
+                yield link
+                if fetched >= num_results:
+                    break
+            if new_results == 0:
+                break
+            start += 10
+
+    googlesearch = types.ModuleType("googlesearch")
+    googlesearch.search = search
+    return googlesearch
+
+
+def check_search_paging():
+    """Incremental search keeps returning new usernames however deep the cached offset gets"""
+    corpus = [f"https://www.linkedin.com/in/person-{i}" for i in range(200)]
+    with mock.patch.dict(sys.modules, {"googlesearch": _stub_googlesearch(corpus)}):
+        assert list(google_search_backend("q", 5, 40)) == corpus[40:45]
+        scraper = LinkedInScraper(api_key="smoke", embedder=HashingEmbedder(),
+                                  search_cache=PersistentCache(":memory:", namespace="google_search"))
+        try:
+            seen: List[str] = []
+            for _ in range(6):
+                batch = scraper.extract_linkedin_usernames("site:linkedin.com/in python", 5, incremental=True)
+                assert len(batch) == 5 and not set(batch) & set(seen), batch
+                seen.extend(batch)
+        finally:
+            scraper.close()
+        assert seen == [f"person-{i}" for i in range(30)], seen
+
+
+def check_screen_repeated():
+    """Repeated screen() calls keep working with the shared ChatMistralAI and its async connections"""
+    with FakeMistralAPI() as api:
+        llm = get_llm("mistral-small-latest", api_key="smoke", endpoint=api.url)
+        engine = ScreeningEngine(llm, max_in_flight=4)
+        for run in range(3):
+            candidates = [{"document": f"Candidate {i}, run {run}", "metadata": {"name": f"Candidate {i}"}}
+                          for i in range(4)]
+            errors = [r["error"] for r in engine.screen("Python developer", candidates) if not r["success"]]
+            assert not errors, f"run {run}: {errors}"
+
+
+def check_map_reduce():
+    """map_reduce analysis keeps working across calls and names candidates whose evaluation failed"""
+    embedder = HashingEmbedder()
+    generator = SyntheticProfiles(seed=13)
+    store = _store("smoke_map_reduce", embedder)
+    store.add_profiles(_processed(generator.raw_profiles(20), embedder))
+    role, description = generator.job_descriptions(1)[0]
+
+    with FakeMistralAPI() as api:
+        rag = ProfileRAG(store, api_key="smoke")
+        rag.llm = get_llm("mistral-small-latest", api_key="smoke", endpoint=api.url)
+        for run in range(2):
+            result = rag.analyze_candidates(role, f"{description} (run {run})", n_results=6, mode="map_reduce")
+            assert "analysis" in result and not result["missing"], result.get("missing") or result.get("error")
+
+    # With this seed two map calls fail and the reduce call (the seventh) succeeds
+    rag.llm = FakeMistral(latency=0.0, error_rate=0.5, seed=1)
+    rag.rate_limiter = RateLimiter("smoke", rate=1000, max_retries=0)
+    result = rag.analyze_candidates(role, description, n_results=6, mode="map_reduce", bypass_cache=True)
+    failed = [e["name"] for e in result["evaluations"] if e["error"]]
+    assert failed and [m["name"] for m in result["missing"]] == failed, result
+    assert all(name in result["analysis"] for name in failed), result["analysis"]
+
+def check_pipeline_end_to_end():
+    """Usernames stream through fetch, embed, store and screen; reruns rescreen the stored profiles"""
+    embedder = HashingEmbedder()
+    generator = SyntheticProfiles(seed=14)
+    usernames = [generator.username(i) for i in range(12)] + ["not-a-candidate"]
+    store = _store("smoke_pipeline", embedder)
+
+    with FakeRapidAPI(generator) as rapid, FakeMistralAPI() as api:
+        unlimited = RateLimiter("smoke", rate=1000)
+        scraper = LinkedInScraper(api_key="smoke", api_url=rapid.url, embedder=embedder, rate_limiter=unlimited)
+        engine = ScreeningEngine(get_llm("mistral-small-latest", api_key="smoke", endpoint=api.url),
+                                 max_in_flight=4, rate_limiter=unlimited)
+
+        async def screen(candidate):
+            result = (await engine.ascreen("Python developer", [candidate]))[0]
+            assert result["success"], result["error"]
+            return dict(candidate, score=result["score"])
+
+        try:
+            for expected_status in ("added", "unchanged"):
+                pipeline = PipelineRunner(profile_ingest_stages(scraper, store) + [Stage("screen", screen, workers=4)])
+                results = pipeline.run(usernames)
+                assert not pipeline.failures, pipeline.failures
+                assert sorted(r["metadata"]["username"] for r in results) == sorted(usernames[:-1]), results
+                assert {r["status"] for r in results} == {expected_status}, [r["status"] for r in results]
+                assert all(r["score"] for r in results), results
+                fetch = pipeline.stats()[0]
+                assert fetch["processed"] == len(usernames) and fetch["dropped"] == 1, fetch
+        finally:
+            scraper.close()
+    assert store.collection.count() == len(usernames) - 1, store.collection.count()
+
+
+def check_title_filter():
+    """A title filter matches headlines containing its words, in any case and position"""
+    embedder = HashingEmbedder()
+    store = _store("smoke_title_filter", embedder)
+    profiles = _processed(SyntheticProfiles(seed=15).raw_profiles(60), embedder)
+    store.add_profiles(profiles)
+
+    for title in ("Python Developer", "senior software engineer", "Engineer"):
+        words = set(title_words(title))
+        expected = sorted(p["username"] for p in profiles if words <= set(title_words(p["title"])))
+        hits = store.search_profiles("developer", n_results=len(profiles), filters={"title": title})
+        assert expected, title
+        assert sorted(hit["metadata"]["username"] for hit in hits) == expected, (title, hits)
+
+
+class _FailingStore:
+    """Store wrapper that reports one username as failed until it is allowed through"""
+    def __init__(self, store: ProfileVectorStore, username: str):
+        self.store = store
+        self.username = username
+
+    def add_profiles(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        kept = [p for p in profiles if p["username"] != self.username]
+        stored = iter(self.store.add_profiles(kept))
+        return [next(stored) if p["username"] != self.username else
+                {"username": p["username"], "id": "", "success": False, "status": "failed",
+                 "duplicate_of": None, "error": "injected failure"} for p in profiles]
+
+
+def check_import_resume():
+    """A row that failed to store is retried when the import resumes"""
+    embedder = HashingEmbedder()
+    raw = SyntheticProfiles(seed=16).raw_profiles(10)
+    store = _store("smoke_import_resume", embedder)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "name", "headline", "skills"])
+            writer.writerows([p["username"], p["name"], p["headline"], ", ".join(p["skills"])] for p in raw)
+
+        first = BulkImporter(_FailingStore(store, raw[5]["username"]), chunk_size=4).import_file(path)
+        assert first["failed"] == 1 and first["first_failed_row"] == 5, first
+        assert os.path.exists(f"{path}.import.json"), "checkpoint removed with a row left to retry"
+
+        second = BulkImporter(store, chunk_size=4).import_file(path)
+        assert second["start_row"] == 5 and second["added"] == 1 and second["unchanged"] == 4, second
+        assert second["first_failed_row"] is None and not os.path.exists(f"{path}.import.json"), second
+    assert store.collection.count() == len(raw), store.collection.count()
+
+
+CHECKS: Dict[str, Callable[[], None]] = {
+    "dedup_unrelated": check_dedup_unrelated,
+    "dedup_merges_copies": check_dedup_merges_copies,
+    "crew_tasks": check_crew_tasks,
+    "search_paging": check_search_paging,
+    "screen_repeated": check_screen_repeated,
+    "map_reduce": check_map_reduce,
+    "pipeline_end_to_end": check_pipeline_end_to_end,
+    "title_filter": check_title_filter,
+    "import_resume": check_import_resume,
+}
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default="", help="Comma-separated checks to run (default: all)")
+    args = parser.parse_args(argv)
+    only = [name.strip() for name in args.only.split(",") if name.strip()] or list(CHECKS)
+    unknown = [name for name in only if name not in CHECKS]
+    if unknown:
+        print(f"Unknown checks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    failed = 0
+    for name in only:
+        try:
+            CHECKS[name]()
+            print(f"ok   {name}")
+        except Exception:
+            failed += 1
+            print(f"FAIL {name}\n{traceback.format_exc()}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
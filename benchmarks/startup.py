@@ -0,0 +1,180 @@
+"""
+Startup-time benchmark
+
+Imports each entry point in a fresh interpreter under `python -X importtime`,
+reports the cumulative import time and the heaviest imports, and fails when a
+target goes over its budget or loads a module that should stay deferred:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --targets main,demo --repeat 7 --output startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point -> import budget in milliseconds (measured on a warm bytecode cache)
+STARTUP_TARGETS: Dict[str, float] = {
+    "main": 150.0,
+    "tasks.hr_tasks": 150.0,
+    "utils.vector_store": 300.0,
+    "utils.rag_system": 400.0,
+    "demo": 500.0,
+}
+
+# Only the stage that needs one of these may import it
+DEFERRED_MODULES = (
+    "crewai", "langchain", "langchain_core", "langchain_mistralai", "langchain_community",
+    "chromadb", "sentence_transformers", "torch", "transformers", "googlesearch",
+)
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse `-X importtime` output
+
+    Args:
+        stderr: Standard error of the interpreter
+
+    Returns:
+        One entry per imported module with module, depth, self_us and cumulative_us
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({"module": module, "depth": len(indent) // 2,
+                            "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return entries
+
+
+def profile_import(module: str, python: str = sys.executable) -> Dict[str, Any]:
+    """
+    Import one module in a fresh interpreter and measure it
+
+    Args:
+        module: Dotted module name, importable from the repository root
+        python: Interpreter to run
+
+    Returns:
+        Dict with import_ms (cumulative time of the module itself), wall_ms
+        (whole interpreter run), the parsed entries and deferred modules loaded
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=REPO_ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    entries = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown error"
+        return {"error": error, "wall_ms": round(wall * 1000, 1)}
+    top = next((e for e in reversed(entries) if e["module"] == module and e["depth"] == 0), None)
+    loaded = {e["module"].split(".")[0] for e in entries}
+    return {
+        "import_ms": round(top["cumulative_us"] / 1000, 1) if top else None,
+        "wall_ms": round(wall * 1000, 1),
+        "modules": len(entries),
+        "deferred_loaded": sorted(loaded.intersection(DEFERRED_MODULES)),
+        "entries": entries,
+    }
+
+
+def heaviest(entries: Sequence[Dict[str, Any]], n: int = 10) -> List[Dict[str, Any]]:
+    """The n imports with the largest self time, in milliseconds"""
+    ranked = sorted(entries, key=lambda e: e["self_us"], reverse=True)[:n]
+    return [{"module": e["module"], "self_ms": round(e["self_us"] / 1000, 1),
+             "cumulative_ms": round(e["cumulative_us"] / 1000, 1)} for e in ranked]
+
+
+def benchmark_target(module: str, budget_ms: float, repeat: int = 5, top: int = 10) -> Dict[str, Any]:
+    """
+    Measure one entry point several times against its budget
+
+    The first run warms the bytecode cache and is discarded; the median of
+    the remaining runs is compared with the budget.
+
+    Args:
+        module: Entry point to import
+        budget_ms: Allowed median import time
+        repeat: Measured runs
+        top: How many of the heaviest imports to report
+
+    Returns:
+        Result dict with median/min/max import time, wall time, heaviest
+        imports, deferred modules that were loaded and pass/fail
+    """
+    profile_import(module)
+    runs = [profile_import(module) for _ in range(max(1, repeat))]
+    failed = next((run for run in runs if "error" in run), None)
+    if failed is not None:
+        return {"module": module, "budget_ms": budget_ms, "ok": False, "error": failed["error"]}
+
+    import_ms = [run["import_ms"] for run in runs if run["import_ms"] is not None]
+    median_ms = round(statistics.median(import_ms), 1) if import_ms else None
+    median_run = min(runs, key=lambda run: abs((run["import_ms"] or 0) - (median_ms or 0)))
+    deferred = median_run["deferred_loaded"]
+    return {
+        "module": module,
+        "budget_ms": budget_ms,
+        "import_ms": {"median": median_ms, "min": min(import_ms, default=None), "max": max(import_ms, default=None)},
+        "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1),
+        "modules": median_run["modules"],
+        "deferred_loaded": deferred,
+        "heaviest": heaviest(median_run["entries"], top),
+        "ok": median_ms is not None and median_ms <= budget_ms and not deferred,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=",".join(STARTUP_TARGETS),
+                        help="Comma-separated entry points to import")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Budget applied to every target instead of the defaults")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured imports per target")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to report per target")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+    results = []
+    for module in targets:
+        budget: Optional[float] = args.budget_ms if args.budget_ms is not None else STARTUP_TARGETS.get(module)
+        result = benchmark_target(module, budget if budget is not None else 500.0, args.repeat, args.top)
+        results.append(result)
+        if "error" in result:
+            status = f"ERROR {result['error']}"
+        else:
+            status = (f"{result['import_ms']['median']:.1f} ms / {result['budget_ms']:.0f} ms budget"
+                      + (f", loads {', '.join(result['deferred_loaded'])}" if result["deferred_loaded"] else ""))
+        print(f"{'ok  ' if result['ok'] else 'FAIL'} {module}: {status}", file=sys.stderr)
+
+    report = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": sys.version.split()[0],
+                 "repeat": args.repeat},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
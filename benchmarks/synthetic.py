@@ -0,0 +1,164 @@
+import hashlib
+import random
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SKILLS = [
+    "Python", "SQL", "Django", "Flask", "FastAPI", "JavaScript", "React", "Node.js", "AWS", "Docker",
+    "Kubernetes", "PostgreSQL", "MongoDB", "Redis", "Git", "Linux", "Java", "Spring Boot", "C++", "Go",
+    "TypeScript", "GCP", "Azure", "Terraform", "CI/CD", "Machine Learning", "Pandas", "NumPy",
+    "TensorFlow", "PyTorch", "Data Analysis", "REST APIs", "GraphQL", "Celery", "Kafka", "Spark",
+    "Airflow", "Tableau", "Power BI", "Excel", "HTML", "CSS", "Angular", "Vue.js", "Rust", "Scala",
+    "Selenium", "Jenkins", "Agile", "Scrum", "Microservices", "System Design", "NLP", "Computer Vision",
+]
+TITLES = [
+    "Python Developer", "Software Engineer", "Backend Developer", "Full Stack Developer",
+    "Data Scientist", "Data Engineer", "DevOps Engineer", "Machine Learning Engineer",
+    "Frontend Developer", "Senior Software Engineer", "Technical Lead", "QA Engineer",
+]
+COMPANIES = [
+    "Axorbit", "Inmakes Infotech", "Northwind Labs", "Globex", "Initech", "Hooli", "Umbrella Systems",
+    "Stark Industries", "Wayne Tech", "Acme Analytics", "Cyberdyne", "Soylent Data",
+]
+SCHOOLS = ["IIT Madras", "NIT Calicut", "Anna University", "VIT Vellore", "TU Berlin", "University of Toronto"]
+DEGREES = [("B.Tech", "Computer Science"), ("M.Tech", "Data Science"), ("B.Sc", "Mathematics"),
+           ("MCA", "Computer Applications"), ("M.Sc", "Statistics")]
+LOCATIONS = ["Bangalore, Karnataka, India", "Kochi, Kerala, India", "Chennai, Tamil Nadu, India",
+             "Berlin, Germany", "Toronto, Ontario, Canada", "London, England, United Kingdom"]
+FIRST_NAMES = ["Priya", "Arjun", "Fathima", "Rahul", "Anna", "Lukas", "Mei", "Omar", "Sara", "Vikram",
+               "Nina", "Kofi", "Elena", "Ravi", "Aisha", "Tom", "Divya", "Jonas", "Lea", "Karthik"]
+LAST_NAMES = ["Nair", "Sharma", "Rahim", "Iyer", "Schmidt", "Chen", "Haddad", "Menon", "Okafor",
+              "Rossi", "Kumar", "Varga", "Patel", "Fischer", "Das", "Silva"]
+WORDS = """
+built designed maintained scalable services pipelines dashboards customers teams production reliable
+latency throughput migrated legacy systems automated testing deployment monitoring features backend
+frontend data models reports stakeholders mentoring reviews architecture performance cloud platform
+integrations payments search analytics workflows internal tools open source contributions delivered
+""".split()
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+class SyntheticProfiles:
+    def __init__(self, seed: int = 0, summary_words: Tuple[int, int] = (20, 80),
+                 experience_entries: Tuple[int, int] = (1, 5), description_words: Tuple[int, int] = (10, 40),
+                 skills_per_profile: Tuple[int, int] = (3, 15), skill_skew: float = 1.1):
+        """
+        Deterministic generator of LinkedIn-like profiles
+
+        Profile i is always the same for a given seed and settings, so runs
+        are repeatable and a fake API can serve any username on demand.
+
+        Args:
+            seed: Base random seed
+            summary_words: (min, max) words in the summary
+            experience_entries: (min, max) experience entries
+            description_words: (min, max) words per experience description
+            skills_per_profile: (min, max) skills listed
+            skill_skew: Zipf exponent of skill popularity (0 for uniform)
+        """
+        self.seed = seed
+        self.summary_words = summary_words
+        self.experience_entries = experience_entries
+        self.description_words = description_words
+        self.skills_per_profile = skills_per_profile
+        weights = np.array([1.0 / (rank + 1) ** skill_skew for rank in range(len(SKILLS))])
+        self._skill_weights = weights / weights.sum()
+
+    @staticmethod
+    def username(index: int) -> str:
+        return f"candidate-{index:07d}"
+
+    @staticmethod
+    def index_of(username: str) -> Optional[int]:
+        match = re.fullmatch(r"candidate-(\d+)", username or "")
+        return int(match.group(1)) if match else None
+
+    def _words(self, rng: random.Random, bounds: Tuple[int, int]) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(*bounds)))
+
+    def raw_profile(self, index: int) -> Dict[str, Any]:
+        """
+        Profile in the shape returned by the RapidAPI LinkedIn endpoint
+
+        Args:
+            index: Profile number
+
+        Returns:
+            Raw profile dict accepted by LinkedInScraper.process_profile
+        """
+        rng = random.Random(f"{self.seed}:{index}")
+        np_rng = np.random.default_rng([self.seed, index])
+        title = rng.choice(TITLES)
+        n_skills = min(len(SKILLS), rng.randint(*self.skills_per_profile))
+        skills = [SKILLS[i] for i in np_rng.choice(len(SKILLS), size=n_skills, replace=False, p=self._skill_weights)]
+
+        year = 2024
+        experience = []
+        for _ in range(rng.randint(*self.experience_entries)):
+            years = rng.randint(1, 4)
+            experience.append({
+                "title": rng.choice(TITLES),
+                "company": rng.choice(COMPANIES),
+                "date_range": f"Jan {year - years} - {'Present' if not experience else f'Dec {year}'}",
+                "description": self._words(rng, self.description_words),
+            })
+            year -= years + 1
+        degree, field = rng.choice(DEGREES)
+
+        return {
+            "username": self.username(index),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}",
+            "headline": f"{title} | {', '.join(skills[:3])}",
+            "summary": f"{title} with {len(experience)} roles. {self._words(rng, self.summary_words)}",
+            "geo": {"full": rng.choice(LOCATIONS)},
+            "experience": experience,
+            "education": [{"school": rng.choice(SCHOOLS), "degree": degree, "field": field,
+                           "date_range": f"{year - 4} - {year}"}],
+            "skills": skills,
+        }
+
+    def raw_profiles(self, n: int, start: int = 0) -> List[Dict[str, Any]]:
+        return [self.raw_profile(i) for i in range(start, start + n)]
+
+    def job_descriptions(self, n: int) -> List[Tuple[str, str]]:
+        """(job_role, job_description) pairs built from the same vocabulary"""
+        rng = random.Random(f"{self.seed}:jobs")
+        jobs = []
+        for _ in range(n):
+            role = rng.choice(TITLES)
+            skills = rng.sample(SKILLS, 6)
+            jobs.append((role, f"We are hiring a {role}. Requirements: {rng.randint(1, 8)}+ years of "
+                               f"experience with {', '.join(skills[:4])}. Preferred: {', '.join(skills[4:])}."))
+        return jobs
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 384):
+        """
+        Deterministic bag-of-words embedder with no model download
+
+        Stands in for EmbeddingService when benchmarking code around the
+        model rather than the model itself.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim
+        self.model_name = f"hashing-{dim}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if (digest >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
+
+    def encode_many(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._vector(text).tolist() for text in texts]
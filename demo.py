@@ -2,9 +2,11 @@ import os
 import logging
 from dotenv import load_dotenv
 from agents.profile_scraper_agent import ProfileScraperAgent
+from utils.metrics import configure_from_env
 
 # Load environment variables from .env file
 load_dotenv()
+configure_from_env()
 
 # Setup logging
 logging.basicConfig(
@@ -43,19 +45,27 @@ def main():
     logger.info(f"Collected {len(profiles)} profiles")
     
     # Step 2: Analyze candidates using RAG
-    if profiles:
+    if profiles and scraper_agent.rag is None:
+        print("Error: RAG system unavailable (MISTRAL_API_KEY is not set); skipping analysis")
+    elif profiles:
         logger.info("Analyzing candidates using RAG")
-        analysis = scraper_agent.analyze_candidates(job_role, job_description)
         
-        # Print results
+        # Print results as they stream in
         print("\n" + "="*50)
         print("CANDIDATE ANALYSIS RESULTS")
         print("="*50 + "\n")
         
-        if "error" in analysis:
-            print(f"Error: {analysis['error']}")
-        else:
-            print(analysis["analysis"])
+        try:
+            received = False
+            for chunk in scraper_agent.stream_analysis(job_role, job_description,
+                                                        filters={"location": location}):
+                received = True
+                print(chunk, end="", flush=True)
+            print()
+            if not received:
+                print("Error: No matching profiles found")
+        except Exception as e:
+            print(f"\nError: Analysis failed: {e}")
     else:
         logger.warning("No profiles collected, skipping analysis")
 
@@ -1,11 +1,14 @@
 from dotenv import load_dotenv
 from tasks.hr_tasks import HRTasks
-from crewai import Crew, Process
+from utils.metrics import configure_from_env, metrics
 import os
 
 load_dotenv()
+configure_from_env()
 
 def main():
+    from crewai import Crew, Process
+
     hr_query = input("HR, please enter your job-role query: ")
 
     hr_tasks = HRTasks()
@@ -18,7 +21,9 @@ def main():
     )
 
     # Get the result from CrewOutput object
-    crew_output = query_crew.kickoff()
+    hr_tasks.begin_run()
+    with metrics.timer("crew_kickoff", crew="hr_query"):
+        crew_output = query_crew.kickoff()
     # Access the actual string result
     job_details = str(crew_output)
     job_role = job_details.strip().replace("Job Role:", "").strip()
@@ -45,7 +50,9 @@ def main():
         process=Process.sequential
     )
 
-    results = hr_crew.kickoff()
+    hr_tasks.begin_run()
+    with metrics.timer("crew_kickoff", crew="hr_pipeline"):
+        results = hr_crew.kickoff()
     print("Final Results:")
     print(results)
 
@@ -1,92 +1,103 @@
 import os
-import time
 from dotenv import load_dotenv
-from langchain_mistralai import ChatMistralAI, MistralAIEmbeddings
-from langchain.vectorstores import Chroma
-from utils.db import get_chroma_client
-from tasks.hr_tasks import scrape_and_store_profiles
-
-from agents.profile_scraper_agent import get_profile_scraper_agent
-from agents.cv_screening_agent import get_cv_screening_agent
-from agents.reporting_agent import get_reporting_agent
-from agents.communication_agent import get_communication_agent  # ✅ New import
-from agents.interview_scheduler_agent import get_interview_scheduler_agent  # ✅ New import
+from utils.linkedin_scraper import LinkedInScraper
+from utils.llm_registry import get_llm
+from utils.llm_cache import get_llm_cache
+from utils.metrics import configure_from_env
+from utils.rate_limit import invoke_llm
+from utils.pipeline import PipelineRunner, Stage, profile_ingest_stages
+from utils.prefilter import CandidatePrefilter
+from utils.screening import ScreeningEngine
+from utils.vector_store import ProfileVectorStore
 
 # Load environment
 load_dotenv()
+configure_from_env()
 
-# Setup ChromaDB
-client = get_chroma_client()
-collection = client.get_or_create_collection("candidate_profiles")
+JOB_ROLE = "Python Developer"
+NUM_PROFILES = 20
+# Best stored profiles from earlier runs screened alongside the new ones
+TOP_K_STORED = 5
+# Profiles scoring below this in the prefilter never reach the LLM
+MIN_PREFILTER_SCORE = 0.3
 
-# Mistral setup
-llm = ChatMistralAI(api_key=os.getenv('MISTRAL_API_KEY'))
-embedding_fn = MistralAIEmbeddings(api_key=os.getenv('MISTRAL_API_KEY'))
-vectorstore = Chroma(collection_name="candidate_profiles",
-                     persist_directory="./data/chromadb_data",
-                     embedding_function=embedding_fn)
+# Profile store and scraper (profiles are embedded locally before storing)
+vector_store = ProfileVectorStore(collection_name="linkedin_profiles")
+scraper = LinkedInScraper(api_key=os.getenv('RAPIDAPI_KEY'))
 
-# Initialize Agents
-profile_scraper_agent = get_profile_scraper_agent(llm)
-cv_screening_agent = get_cv_screening_agent(llm)
-communication_agent = get_communication_agent(llm)             # ✅ Initialize
-interview_scheduler_agent = get_interview_scheduler_agent(llm) # ✅ Initialize
-reporting_agent = get_reporting_agent(llm)
+# Mistral setup; every step shares the one client
+llm = get_llm(model=None)
 
 def main():
-    # Step 1: Scrape Profiles
-    scrape_and_store_profiles(collection, embedding_fn)
-
-    # Step 2: CV Screening
+    # Step 1: Find profiles; fetching, embedding and storing them is streamed below
     query = "Skills: Python"
-    docs = vectorstore.similarity_search(query, k=5)
+    usernames = scraper.find_profiles(JOB_ROLE, num_results=NUM_PROFILES)
+
+    # Step 2: CV Screening. Tier 1: the cheap prefilter scans every stored
+    # profile and gates each new one, so only the best reach the LLM
+    prefilter = CandidatePrefilter(embedder=vector_store.embedder, top_k=TOP_K_STORED,
+                                   min_score=MIN_PREFILTER_SCORE)
+    stored = prefilter.shortlist_store(vector_store, query)
+    known = {candidate["metadata"].get("username") for candidate in stored}
+    engine = ScreeningEngine(llm, max_in_flight=4, cache=get_llm_cache())
+
+    def shortlist(candidate):
+        if "prefilter_score" in candidate:
+            return candidate
+        return candidate if prefilter.shortlist(query, [candidate]) else None
+
+    async def screen(candidate):
+        result = (await engine.ascreen(query, [candidate]))[0]
+        name = result["profile"].get("name", "Unknown")
+        if not result["success"]:
+            print(f"Error processing candidate {name}: {result['error']}")
+            return None
+        print(f"Processed candidate {name}")
+        return {"profile": result["profile"], "score": result["score"]}
 
-    scored_candidates = []
-    for i, doc in enumerate(docs):
-        try:
-            if i > 0:
-                print(f"Waiting 2 seconds before processing next candidate...")
-                time.sleep(2)
-
-            scoring_prompt = f"Score candidate (1-10) based on: {query}\n{doc.page_content}"
-            score = llm.invoke(scoring_prompt)
-            scored_candidates.append({"profile": doc.metadata, "score": score.content})
-            print(f"Processed candidate {i+1}/{len(docs)}: {doc.metadata['name']}")
+    # Step 3: Communication via Telegram or Email
+    def communicate(candidate):
+        # Example: Trigger agent (Pseudo-logic)
+        communication_prompt = f"Send interview invitation to {candidate['profile']['name']} via preferred method."
+        response = invoke_llm(llm, communication_prompt)
+        print(f"\n📩 Communicated with {candidate['profile']['name']}: {response.content}")
+        return candidate
 
-        except Exception as e:
-            print(f"Error processing candidate {i+1}: {str(e)}")
+    # Step 4: Schedule Interview via Outlook Calendar
+    def schedule(candidate):
+        scheduling_prompt = f"Schedule an interview with {candidate['profile']['name']} based on availability."
+        response = invoke_llm(llm, scheduling_prompt)
+        print(f"\n📅 Scheduled interview with {candidate['profile']['name']}: {response.content}")
+        return candidate
+
+    # Steps 1-4 run as one pipeline: a profile is screened as soon as it is
+    # stored, and contacted and scheduled as soon as its own score is in
+    pipeline = PipelineRunner(profile_ingest_stages(scraper, vector_store) + [
+        Stage("prefilter", shortlist),
+        Stage("screen", screen, workers=4),
+        Stage("communicate", communicate, workers=2),
+        Stage("schedule", schedule, workers=2),
+    ])
+    # Stored shortlisted candidates skip the scrape stages
+    scored_candidates = pipeline.run(stored + [username for username in usernames if username not in known])
+    scraper.close()
 
     # Display screened candidates
     print("\n✅ Screened Candidates:")
     for candidate in scored_candidates:
         print(f"- {candidate['profile']['name']}: {candidate['score']}")
 
-    # Step 3: Communication via Telegram or Email
-    for candidate in scored_candidates:
-        print(f"\n📩 Communicating with candidate: {candidate['profile']['name']}")
-        # Example: Trigger agent (Pseudo-logic)
-        communication_prompt = f"Send interview invitation to {candidate['profile']['name']} via preferred method."
-        response = communication_agent.llm.invoke(communication_prompt)
-        print(f"Communication status: {response.content}")
-        time.sleep(1)  # Avoid rate limiting
-
-    # Step 4: Schedule Interview via Outlook Calendar
-    for candidate in scored_candidates:
-        print(f"\n📅 Scheduling interview with: {candidate['profile']['name']}")
-        scheduling_prompt = f"Schedule an interview with {candidate['profile']['name']} based on availability."
-        response = interview_scheduler_agent.llm.invoke(scheduling_prompt)
-        print(f"Scheduling status: {response.content}")
-        time.sleep(1)  # Avoid rate limiting
+    print("\n⏱️ Pipeline stages:")
+    for stage in pipeline.stats():
+        print(f"- {stage['stage']}: {stage['processed']} processed, {stage['failed']} failed, "
+              f"{stage['throughput_per_second']} items/s, max queue depth {stage['max_queue_depth']}")
 
     # Step 5: Generate Report
-    print("\nWaiting 5 seconds before generating report...")
-    time.sleep(5)
-
     if scored_candidates:
         try:
             report_prompt = "Generate a summary report of candidates:\n" + \
                         "\n".join([f"{c['profile']['name']} - Score: {c['score']}" for c in scored_candidates])
-            report = reporting_agent.llm.invoke(report_prompt)
+            report = invoke_llm(llm, report_prompt)
             print("\n📑 HR Report:\n", report.content)
         except Exception as e:
             print(f"\n❌ Error generating report: {str(e)}")
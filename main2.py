@@ -1,9 +1,11 @@
-import os
-import time
 from dotenv import load_dotenv
-from langchain_mistralai import ChatMistralAI, MistralAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from utils.db import get_chroma_client
+from utils.llm_registry import get_llm
+from utils.llm_cache import get_llm_cache
+from utils.metrics import configure_from_env, metrics
+from utils.rate_limit import invoke_llm
+from utils.prefilter import CandidatePrefilter
+from utils.screening import ScreeningEngine
+from utils.vector_store import ProfileVectorStore
 from tasks.hr_tasks import scrape_and_store_profiles
 from crewai import Agent, Task, Crew, Process
 from crewai.tools import BaseTool
@@ -11,17 +13,15 @@ from typing import Any, Optional, Dict  # Add type annotations
 
 # Load environment
 load_dotenv()
+configure_from_env()
 
-# Setup ChromaDB
-client = get_chroma_client()
-collection = client.get_or_create_collection("candidate_profiles")
+JOB_ROLE = "Python Developer"
+
+# Profile store the scrape tool writes to (the same one ProfileScraperAgent uses)
+vector_store = ProfileVectorStore(collection_name="linkedin_profiles")
 
 # Mistral setup
-llm = ChatMistralAI(api_key=os.getenv('MISTRAL_API_KEY'))
-embedding_fn = MistralAIEmbeddings(api_key=os.getenv('MISTRAL_API_KEY'))
-vectorstore = Chroma(collection_name="candidate_profiles",
-                     persist_directory="./data/chromadb_data",
-                     embedding_function=embedding_fn)
+llm = get_llm(model=None)
 
 def main():
     # Define tools using CrewAI's BaseTool with proper type annotations
@@ -30,41 +30,23 @@ def main():
         description: str = "Scrapes and stores candidate profiles in the database."
         
         def _run(self, *args: Any, **kwargs: Any) -> str:
-            scrape_and_store_profiles(collection, embedding_fn)
-            return "Profiles successfully scraped and stored in the database."
+            profiles = scrape_and_store_profiles(JOB_ROLE)
+            return f"{len(profiles)} profiles successfully scraped and stored in the database."
 
     class ScreenCandidatesTool(BaseTool):
         name: str = "screen_candidates"
         description: str = "Screens candidate CVs based on a query for Python skills."
         
         def _run(self, query: str = "Skills: Python", k: int = 5) -> str:
-            docs = vectorstore.similarity_search(query, k=k)
-            scored_candidates = []
-            for i, doc in enumerate(docs):
-                try:
-                    # Add delay between API calls to avoid rate limiting
-                    if i > 0:
-                        print(f"Waiting 2 seconds before processing next candidate...")
-                        time.sleep(2)
-                        
-                    scoring_prompt = f"Score candidate (1-10) based on: {query}\n{doc.page_content}"
-                    score = llm.invoke(scoring_prompt)
-                    scored_candidates.append({"profile": doc.metadata, "score": score.content})
-                    print(f"Processed candidate {i+1}/{len(docs)}: {doc.metadata['name']}")
-                    
-                except Exception as e:
-                    print(f"Error processing candidate {i+1}: {str(e)}")
-                    if "rate limit" in str(e).lower():
-                        print("Rate limit hit. Waiting 10 seconds...")
-                        time.sleep(10)
-                        try:
-                            scoring_prompt = f"Score candidate (1-10) based on: {query}\n{doc.page_content}"
-                            score = llm.invoke(scoring_prompt)
-                            scored_candidates.append({"profile": doc.metadata, "score": score.content})
-                            print(f"Successfully processed candidate {i+1} after waiting")
-                        except Exception as e2:
-                            print(f"Still failed after waiting: {str(e2)}")
-                            scored_candidates.append({"profile": doc.metadata, "score": "N/A (API Error)"})
+            # The cheap prefilter scans every stored profile; only its top k reach the LLM
+            prefilter = CandidatePrefilter(embedder=vector_store.embedder, top_k=k)
+            shortlist = prefilter.shortlist_store(vector_store, query)
+            engine = ScreeningEngine(llm, max_in_flight=4, cache=get_llm_cache())
+            results = engine.screen(query, shortlist)
+            scored_candidates = [
+                {"profile": r["profile"], "score": r["score"] if r["success"] else f"N/A ({r['error']})"}
+                for r in results
+            ]
             
             result = "\n".join([f"{c['profile']['name']}: {c['score']}" for c in scored_candidates])
             return result
@@ -75,7 +57,7 @@ def main():
         
         def _run(self, candidate_scores: str) -> str:
             report_prompt = "Generate a comprehensive report on these candidates:\n" + candidate_scores
-            report = llm.invoke(report_prompt)
+            report = invoke_llm(llm, report_prompt)
             return report.content
 
     # Instantiate the tools
@@ -146,7 +128,8 @@ def main():
     )
     
     # Execute the crew
-    result = hr_crew.kickoff()
+    with metrics.timer("crew_kickoff", crew="hr_screening"):
+        result = hr_crew.kickoff()
     print("\n\n=== FINAL RESULT ===")
     print(result)
 
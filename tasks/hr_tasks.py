@@ -1,71 +1,123 @@
-from crewai import Agent, Task
-from agents.profile_scraper_agent import ProfileScraperAgent
-from agents.cv_screening_agent import CVScreeningAgent
-from agents.communication_agent import CommunicationAgent
-from agents.interview_scheduler_agent import InterviewSchedulerAgent
-from agents.reporting_agent import ReportingAgent
-from agents.hr_query_agent import HRQueryAgent
+import importlib
+import time
+from utils.metrics import metrics
+
+# Agent modules (and crewai behind them) are imported when an agent is first
+# requested, so a crew only loads the agents it actually uses
+_AGENT_CLASSES = {
+    "hr_query": ("agents.hr_query_agent", "HRQueryAgent"),
+    "profile_scraper": ("agents.profile_scraper_agent", "ProfileScraperAgent"),
+    "cv_screening": ("agents.cv_screening_agent", "CVScreeningAgent"),
+    "communication": ("agents.communication_agent", "CommunicationAgent"),
+    "interview_scheduler": ("agents.interview_scheduler_agent", "InterviewSchedulerAgent"),
+    "reporting": ("agents.reporting_agent", "ReportingAgent"),
+}
+
+
+def _agent_class(name):
+    module, attribute = _AGENT_CLASSES[name]
+    return getattr(importlib.import_module(module), attribute)
+
+
+def _task(**kwargs):
+    from crewai import Task
+
+    return Task(**kwargs)
+
+
+def scrape_and_store_profiles(job_role, location=None, num_results=10):
+    """Find LinkedIn profiles for a role, store them in the profile vector store and return them"""
+    return _agent_class("profile_scraper")().collect_profiles(job_role, location, num_results)
 
 class HRTasks:
+    def __init__(self):
+        # Each agent is built once and shared by the Crew agent list and its Task
+        self._agents = {}
+        self._last_finish = time.perf_counter()
+
+    def begin_run(self):
+        """Mark the start of a crew run; sequential task durations are measured from here"""
+        self._last_finish = time.perf_counter()
+
+    def _completed(self, name):
+        """Task callback recording completion count and duration (tasks run sequentially)"""
+        def callback(output):
+            now = time.perf_counter()
+            metrics.inc("crew_tasks_completed_total", task=name)
+            metrics.observe("crew_task_seconds", now - self._last_finish, task=name)
+            self._last_finish = now
+        return callback
+
+    def _agent(self, key, factory):
+        if key not in self._agents:
+            self._agents[key] = factory()
+        return self._agents[key]
+
     def hr_query_agent(self):
-        return HRQueryAgent.agent()
+        return self._agent("hr_query", lambda: _agent_class("hr_query").agent())
 
     def profile_scraper_agent(self, job_role):
-        return ProfileScraperAgent.agent(job_role=job_role)
+        return self._agent(("profile_scraper", job_role), lambda: _agent_class("profile_scraper").agent(job_role=job_role))
 
     def cv_screening_agent(self):
-        return CVScreeningAgent.agent()
+        return self._agent("cv_screening", lambda: _agent_class("cv_screening").agent())
 
     def communication_agent(self):
-        return CommunicationAgent.agent()
+        return self._agent("communication", lambda: _agent_class("communication").agent())
 
     def interview_scheduler_agent(self):
-        return InterviewSchedulerAgent.agent()
+        return self._agent("interview_scheduler", lambda: _agent_class("interview_scheduler").agent())
 
     def reporting_agent(self):
-        return ReportingAgent.agent()
+        return self._agent("reporting", lambda: _agent_class("reporting").agent())
 
     def handle_hr_query(self, hr_query):
-        return Task(
+        return _task(
             description=(
                 f"Interpret this HR query: '{hr_query}'. Clearly specify the exact job role and essential skills. "
                 "Pass these details to subsequent tasks for scraping and screening."
             ),
             agent=self.hr_query_agent(),
-            expected_output="Clearly identified job role and essential skills from HR's query."
+            expected_output="Clearly identified job role and essential skills from HR's query.",
+            callback=self._completed("handle_hr_query")
         )
 
     def scrape_profiles(self, job_role):
-        return Task(
+        return _task(
             description=f"Scrape candidate profiles matching the role: '{job_role}'.",
             agent=self.profile_scraper_agent(job_role=job_role),
-            expected_output="Excel file of candidate profiles for given role."
+            expected_output="Excel file of candidate profiles for given role.",
+            callback=self._completed("scrape_profiles")
         )
 
     def screen_cvs(self, job_role):
-        return Task(
+        return _task(
             description=f"Screen and score CVs for candidates relevant to '{job_role}'.",
             agent=self.cv_screening_agent(),
-            expected_output="CSV file with scored CVs for the role."
+            expected_output="CSV file with scored CVs for the role.",
+            callback=self._completed("screen_cvs")
         )
 
     def communicate(self):
-        return Task(
+        return _task(
             description="Communicate interview information to shortlisted candidates.",
             agent=self.communication_agent(),
-            expected_output="Record of communications sent to candidates."
+            expected_output="Record of communications sent to candidates.",
+            callback=self._completed("communicate")
         )
 
     def schedule_interviews(self):
-        return Task(
+        return _task(
             description="Schedule interviews with candidates based on availability.",
             agent=self.interview_scheduler_agent(),
-            expected_output="Confirmed schedule of interviews."
+            expected_output="Confirmed schedule of interviews.",
+            callback=self._completed("schedule_interviews")
         )
 
     def generate_report(self):
-        return Task(
+        return _task(
             description="Generate a comprehensive recruitment summary report.",
             agent=self.reporting_agent(),
-            expected_output="Recruitment report document."
+            expected_output="Recruitment report document.",
+            callback=self._completed("generate_report")
         )
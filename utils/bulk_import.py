@@ -0,0 +1,322 @@
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Profile field -> accepted source column names (matched case-insensitively,
+# ignoring spaces, dashes and underscores)
+DEFAULT_COLUMN_MAP: Dict[str, Sequence[str]] = {
+    "username": ["username", "public_identifier", "publicidentifier", "linkedin_username"],
+    "name": ["name", "full_name", "fullname"],
+    "first_name": ["first_name", "firstname"],
+    "last_name": ["last_name", "lastname"],
+    "headline": ["headline"],
+    "title": ["title", "job_title", "current_title"],
+    "summary": ["summary", "about"],
+    "location": ["location", "geo", "city"],
+    "url": ["url", "profile_url", "linkedin_url", "linkedin"],
+    "experience": ["experience", "experiences", "positions"],
+    "education": ["education", "educations"],
+    "skills": ["skills"],
+}
+
+SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm", ".csv", ".parquet")
+
+_LIST_SPLIT_RE = re.compile(r"[\n;,]+")
+_LINE_SPLIT_RE = re.compile(r"[\n;]+")
+_USERNAME_RE = re.compile(r"linkedin\.com/in/([^/?#]+)")
+
+
+def _normalize_column(name: Any) -> str:
+    return re.sub(r"[\s_\-]+", "", str(name or "")).lower()
+
+
+def _clean(value: Any) -> str:
+    """Cell value as stripped text; None and NaN become empty"""
+    if value is None or value != value:
+        return ""
+    return str(value).strip()
+
+
+def resolve_columns(header: Sequence[Any], column_map: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, str]:
+    """
+    Match source columns to profile fields
+
+    Args:
+        header: Column names of the source file
+        column_map: Profile field -> accepted column names (defaults to DEFAULT_COLUMN_MAP)
+
+    Returns:
+        Profile field -> source column name, for fields present in the file
+    """
+    by_normalized = {_normalize_column(column): column for column in header if column is not None}
+    resolved = {}
+    for field, candidates in (column_map or DEFAULT_COLUMN_MAP).items():
+        for candidate in candidates:
+            column = by_normalized.get(_normalize_column(candidate))
+            if column is not None:
+                resolved[field] = column
+                break
+    return resolved
+
+
+def _parse_experience(text: str) -> List[Dict[str, Any]]:
+    """Parse "Title at Company, date range" lines into experience entries"""
+    entries = []
+    for line in _LINE_SPLIT_RE.split(text):
+        line = line.strip(" -•\t")
+        if not line:
+            continue
+        title, _, rest = line.partition(" at ")
+        company, _, date_range = rest.partition(",")
+        entries.append({"title": title.strip(), "company": company.strip(),
+                        "date_range": date_range.strip(), "description": ""})
+    return entries
+
+
+def _parse_education(text: str) -> List[Dict[str, Any]]:
+    """Parse "Degree in Field from School, date range" lines into education entries"""
+    entries = []
+    for line in _LINE_SPLIT_RE.split(text):
+        line = line.strip(" -•\t")
+        if not line:
+            continue
+        head, has_school, tail = line.partition(" from ")
+        if not has_school:
+            head, tail = "", line
+        degree, _, field = head.partition(" in ")
+        school, _, date_range = tail.partition(",")
+        entries.append({"school": school.strip(), "degree": degree.strip(),
+                        "field": field.strip(), "date_range": date_range.strip()})
+    return entries
+
+
+def row_to_profile(row: Dict[str, Any], columns: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Map one source row onto the processed profile schema
+
+    Args:
+        row: Column name -> cell value
+        columns: Profile field -> source column (from resolve_columns)
+
+    Returns:
+        Profile dict as produced by LinkedInScraper.process_profile, or None
+        when the row has no usable username
+    """
+    value = {field: _clean(row.get(column)) for field, column in columns.items()}
+
+    url = value.get("url", "")
+    username = value.get("username", "")
+    if not username and url:
+        match = _USERNAME_RE.search(url)
+        username = match.group(1) if match else ""
+    if not username:
+        return None
+
+    name = value.get("name") or " ".join(filter(None, [value.get("first_name"), value.get("last_name")]))
+    headline = value.get("headline", "")
+    return {
+        "username": username,
+        "source_url": url or f"https://www.linkedin.com/in/{username}",
+        "url": url or f"https://www.linkedin.com/in/{username}",
+        "name": name,
+        "headline": headline,
+        "title": value.get("title") or headline,
+        "summary": value.get("summary", ""),
+        "location": value.get("location", ""),
+        "experience": _parse_experience(value.get("experience", "")),
+        "education": _parse_education(value.get("education", "")),
+        "skills": [s.strip() for s in _LIST_SPLIT_RE.split(value.get("skills", "")) if s.strip()],
+    }
+
+
+def _iter_xlsx(path: str, chunk_size: int, start_row: int) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, None) or [])
+        rows = itertools.islice(rows, start_row, None)
+        while True:
+            chunk = [dict(zip(header, values)) for values in itertools.islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield header, chunk
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path: str, chunk_size: int, start_row: int) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+    import pandas as pd
+
+    reader = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                         skiprows=range(1, start_row + 1))
+    for frame in reader:
+        yield list(frame.columns), frame.to_dict("records")
+
+
+def _iter_parquet(path: str, chunk_size: int, start_row: int) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    header = parquet.schema_arrow.names
+    skip = start_row
+    for batch in parquet.iter_batches(batch_size=chunk_size):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        if skip:
+            batch = batch.slice(skip)
+            skip = 0
+        yield header, batch.to_pylist()
+
+
+def iter_chunks(path: str, chunk_size: int = 1000, start_row: int = 0) -> Iterator[Tuple[List[Any], List[Dict[str, Any]]]]:
+    """
+    Stream a spreadsheet as (header, rows) chunks without loading it whole
+
+    Args:
+        path: XLSX, CSV or Parquet file
+        chunk_size: Rows per chunk
+        start_row: Data rows to skip (header excluded)
+
+    Yields:
+        (header, list of column -> value dicts)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return _iter_xlsx(path, chunk_size, start_row)
+    if extension == ".csv":
+        return _iter_csv(path, chunk_size, start_row)
+    if extension == ".parquet":
+        return _iter_parquet(path, chunk_size, start_row)
+    raise ValueError(f"Unsupported file type {extension}; expected one of {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+class BulkImporter:
+    def __init__(self, vector_store: Any, column_map: Optional[Dict[str, Sequence[str]]] = None,
+                 chunk_size: int = 1000, checkpoint_path: Optional[str] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Streams candidate exports into a ProfileVectorStore
+
+        Rows are read chunk by chunk, mapped onto the profile schema and
+        written through add_profiles, so memory stays bounded by chunk_size.
+        After every chunk the number of rows done is checkpointed, and a
+        rerun resumes from there instead of starting over. The checkpoint
+        never moves past a row that failed to store, so a rerun retries it.
+
+        Args:
+            vector_store: ProfileVectorStore to write into
+            column_map: Profile field -> accepted column names (defaults to DEFAULT_COLUMN_MAP)
+            chunk_size: Rows read and written per chunk
+            checkpoint_path: Checkpoint file (defaults to "<source>.import.json")
+            progress: Called after every chunk with the running totals
+        """
+        self.vector_store = vector_store
+        self.column_map = column_map
+        self.chunk_size = max(1, chunk_size)
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+
+    def _checkpoint_file(self, path: str) -> str:
+        return self.checkpoint_path or f"{path}.import.json"
+
+    @staticmethod
+    def _fingerprint(path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {"source": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _load_checkpoint(self, path: str) -> int:
+        """Rows already imported from this exact file, or 0"""
+        try:
+            with open(self._checkpoint_file(path), encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if {k: checkpoint.get(k) for k in ("source", "size", "mtime")} != self._fingerprint(path):
+            logger.info("Ignoring checkpoint for a different or modified file")
+            return 0
+        return int(checkpoint.get("rows_done", 0))
+
+    def _save_checkpoint(self, path: str, rows_done: int):
+        checkpoint_file = self._checkpoint_file(path)
+        tmp = f"{checkpoint_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(self._fingerprint(path), rows_done=rows_done), f)
+        os.replace(tmp, checkpoint_file)
+
+    def import_file(self, path: str, resume: bool = True) -> Dict[str, Any]:
+        """
+        Import every row of a file into the vector store
+
+        Args:
+            path: XLSX, CSV or Parquet file
+            resume: Continue from the last checkpoint instead of row 0
+
+        Returns:
+            Totals: rows, skipped (no username), added, updated, unchanged,
+            duplicate, failed, start_row, first_failed_row (where a resumed
+            import restarts, None when every row was stored) and elapsed seconds
+        """
+        start_row = self._load_checkpoint(path) if resume else 0
+        if start_row:
+            logger.info(f"Resuming import of {path} from row {start_row}")
+
+        totals = {"rows": 0, "skipped": 0, "added": 0, "updated": 0, "unchanged": 0,
+                  "duplicate": 0, "failed": 0}
+        start = time.perf_counter()
+        rows_done = start_row
+        first_failed_row: Optional[int] = None
+        columns: Optional[Dict[str, str]] = None
+
+        for header, rows in iter_chunks(path, self.chunk_size, start_row):
+            if columns is None:
+                columns = resolve_columns(header, self.column_map)
+                if "username" not in columns and "url" not in columns:
+                    raise ValueError(f"{path} has no username or profile URL column")
+
+            mapped = [(i, row_to_profile(row, columns)) for i, row in enumerate(rows)]
+            mapped = [(i, profile) for i, profile in mapped if profile]
+            totals["rows"] += len(rows)
+            totals["skipped"] += len(rows) - len(mapped)
+            results = self.vector_store.add_profiles([profile for _, profile in mapped])
+            for result in results:
+                status = result.get("status", "failed")
+                totals[status] = totals.get(status, 0) + 1
+
+            # A row failed unless a later copy of the same username in this chunk was stored
+            stored = {result["username"] for result in results if result.get("success")}
+            failed = [i for (i, _), result in zip(mapped, results)
+                      if not result.get("success") and result.get("username") not in stored]
+            if failed and first_failed_row is None:
+                first_failed_row = rows_done + failed[0]
+                logger.warning(f"Row {first_failed_row} of {path} failed; the checkpoint stays there "
+                               f"so a resumed import retries it")
+
+            rows_done += len(rows)
+            # Never checkpoint past a failed row; rows after it that did import
+            # come back as unchanged on resume and are not re-embedded
+            self._save_checkpoint(path, rows_done if first_failed_row is None else first_failed_row)
+            if self.progress:
+                elapsed = time.perf_counter() - start
+                self.progress(dict(totals, rows_done=rows_done, elapsed=elapsed,
+                                   rows_per_second=totals["rows"] / elapsed if elapsed > 0 else None))
+
+        # A finished import needs no resume point, unless rows are left to retry
+        if first_failed_row is None:
+            try:
+                os.remove(self._checkpoint_file(path))
+            except OSError:
+                pass
+
+        totals.update(start_row=start_row, first_failed_row=first_failed_row,
+                      elapsed=round(time.perf_counter() - start, 3))
+        logger.info(f"Imported {path}: {totals}")
+        return totals
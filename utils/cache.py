@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Writes between sweeps that purge expired entries and recount the namespace
+SWEEP_EVERY = 1000
+
+
+def cache_key(*parts: Any) -> str:
+    """Content-addressed key: SHA-256 over the JSON encoding of the parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    def __init__(self, path: str, namespace: str = "default", ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        SQLite-backed key/value cache storing zlib-compressed JSON
+
+        Entries expire after ttl seconds and the least recently used entries
+        are evicted once max_entries or max_bytes is exceeded. Several
+        namespaces can share one database file.
+
+        Entry count and size are kept as running totals, so a write costs a
+        primary-key lookup rather than a scan of the namespace. Expired
+        entries are purged, and the totals resynchronised with the database,
+        every SWEEP_EVERY writes.
+
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache)
+            namespace: Logical partition inside the database
+            ttl: Default time-to-live in seconds (None never expires)
+            max_entries: Maximum number of entries kept in this namespace
+            max_bytes: Maximum compressed payload size kept in this namespace
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)")
+        self._writes = 0
+        with self._lock:
+            self._recount()
+
+    def get(self, key: str, default: Any = None, max_age: Optional[float] = None) -> Any:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+            default: Returned on a miss
+            max_age: Treat entries older than this many seconds as stale,
+                overriding the cache TTL for this lookup only
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        now = time.time()
+        limit = max_age if max_age is not None else self.ttl
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or (limit is not None and now - row[1] > limit):
+                self.misses += 1
+                metrics.inc("cache_requests_total", namespace=self.namespace, result="miss")
+                return default
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self.hits += 1
+        metrics.inc("cache_requests_total", namespace=self.namespace, result="hit")
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value, evicting old entries if over budget"""
+        blob = zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._size_of(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, blob, len(blob), now, now)
+            )
+            self._count += previous is None
+            self._bytes += len(blob) - (previous or 0)
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                self._sweep()
+            if not self._within_budget():
+                self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            previous = self._size_of(key)
+            if previous is not None:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self._count -= 1
+                self._bytes -= previous
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._count = self._bytes = 0
+
+    def _size_of(self, key: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT size FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _recount(self):
+        """Reload the running totals from the database"""
+        self._count, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+
+    def _sweep(self):
+        """Drop expired entries and resynchronise the totals (other processes may share the file)"""
+        if self.ttl is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND created_at < ?",
+                (self.namespace, time.time() - self.ttl)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        self._recount()
+
+    def _within_budget(self) -> bool:
+        return (self.max_entries is None or self._count <= self.max_entries) and \
+            (self.max_bytes is None or self._bytes <= self.max_bytes)
+
+    def _evict(self):
+        """Drop least recently used entries until within budget"""
+        cursor = self._conn.execute(
+            "SELECT key, size FROM cache WHERE namespace = ? ORDER BY accessed_at ASC", (self.namespace,)
+        )
+        victims = []
+        for key, size in cursor:
+            if self._within_budget():
+                break
+            victims.append((self.namespace, key))
+            self._count -= 1
+            self._bytes -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size of this namespace"""
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,136 @@
-import chromadb
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Gitignored, so ingesting never dirties the tracked sample store in
+# data/chromadb_data
+DEFAULT_DB_PATH = "./data/chroma"
+
+# HNSW graph parameters: M (neighbours per node), ef_construction (build-time
+# beam width) and ef_search (query-time beam width). Higher values trade
+# memory and build time for recall.
+DEFAULT_HNSW = {"M": 16, "ef_construction": 100, "ef_search": 100}
+
+_clients: Dict[Optional[str], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_chroma_client(path: Optional[str] = DEFAULT_DB_PATH):
+    """
+    Return the process-wide Chroma client for a storage path
+
+    Every caller asking for the same directory shares one PersistentClient,
+    so its SQLite database and HNSW indexes are opened and loaded once.
+
+    Args:
+        path: Storage directory (None for a shared in-memory client)
+
+    Returns:
+        Chroma client
+    """
+    key = os.path.abspath(path) if path else None
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Deferred so commands that never touch the store skip loading Chroma
+            import chromadb
+
+            if key is None:
+                client = chromadb.EphemeralClient()
+            else:
+                os.makedirs(key, exist_ok=True)
+                client = chromadb.PersistentClient(path=key)
+            _clients[key] = client
+            logger.info(f"Opened Chroma client at {key or 'memory'}")
+        return client
+
+
+def hnsw_metadata(hnsw: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Collection metadata entries configuring the HNSW index"""
+    params = dict(DEFAULT_HNSW, **(hnsw or {}))
+    return {
+        "hnsw:M": int(params["M"]),
+        "hnsw:construction_ef": int(params["ef_construction"]),
+        "hnsw:search_ef": int(params["ef_search"]),
+    }
+
+
+def get_collection(name: str, path: Optional[str] = DEFAULT_DB_PATH, hnsw: Optional[Dict[str, int]] = None):
+    """
+    Get or create a collection on the shared client
+
+    HNSW parameters only take effect when the collection is created; an
+    existing collection keeps the parameters it was built with.
+
+    Args:
+        name: Collection name
+        path: Storage directory (None for in-memory)
+        hnsw: Overrides for M, ef_construction and ef_search
+
+    Returns:
+        Chroma collection
+    """
+    client = get_chroma_client(path)
+    try:
+        return client.get_collection(name=name)
+    except Exception:
+        return client.get_or_create_collection(name=name, metadata=hnsw_metadata(hnsw))
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            try:
+                total += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                pass
+    return total
+
+
+def warm_collection(collection, path: Optional[str] = DEFAULT_DB_PATH) -> Dict[str, Any]:
+    """
+    Load a collection's vector index into memory ahead of the first search
+
+    Chroma loads the HNSW index lazily on the first query; running one query
+    against a stored vector at startup moves that cost out of the request path.
+
+    Args:
+        collection: Chroma collection
+        path: Storage directory the collection lives in (None for in-memory)
+
+    Returns:
+        Dict with profiles, disk_bytes and load_seconds
+    """
+    start = time.perf_counter()
+    count = collection.count()
+    if count:
+        sample = collection.peek(1).get("embeddings")
+        if sample is not None and len(sample):
+            collection.query(query_embeddings=[list(sample[0])], n_results=1, include=[])
+    stats = {
+        "collection": collection.name,
+        "profiles": count,
+        "disk_bytes": _directory_size(path) if path and os.path.isdir(path) else 0,
+        "load_seconds": round(time.perf_counter() - start, 4),
+    }
+    logger.info(f"Warm-loaded {collection.name}: {count} profiles, "
+                f"{stats['disk_bytes'] / 1024 / 1024:.1f} MB on disk in {stats['load_seconds']:.2f}s")
+    return stats
+
 
 class DBManager:
-    def __init__(self, path='data/chromadb_data'):
-        self.client = chromadb.PersistentClient(path=path)
+    def __init__(self, path=DEFAULT_DB_PATH, hnsw: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.hnsw = hnsw
+        self.client = get_chroma_client(path)
 
     def get_collection(self, collection_name):
-        return self.client.get_or_create_collection(name=collection_name)
+        return get_collection(collection_name, self.path, self.hnsw)
+
+    def warm_load(self, collection_name) -> Dict[str, Any]:
+        return warm_collection(self.get_collection(collection_name), self.path)
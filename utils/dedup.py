@@ -0,0 +1,173 @@
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .bm25 import tokenize
+
+_PRIME = (1 << 61) - 1
+_LOW_32 = np.uint64((1 << 32) - 1)
+_LOW_29 = np.uint64((1 << 29) - 1)
+
+
+def shingles(text: str, k: int = 3) -> List[str]:
+    """Word k-grams of a text (the whole text when it has fewer than k tokens)"""
+    tokens = tokenize(text)
+    if len(tokens) <= k:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+
+
+def name_key(name: Any) -> str:
+    """Normalized person name used to guard merges (case and punctuation folded)"""
+    return re.sub(r"[\W_]+", " ", str(name or "").casefold()).strip()
+
+
+class DuplicateDetector:
+    def __init__(self, threshold: float = 0.8, embedding_threshold: float = 0.97,
+                 num_perm: int = 128, bands: int = 32, seed: int = 7):
+        """
+        Near-duplicate detection for profile documents
+
+        Documents are reduced to MinHash signatures over word shingles. The
+        signature is split into bands whose hashes are stored as metadata
+        ("lsh_band_<i>"), so finding candidates is an indexed metadata lookup
+        in Chroma rather than an in-memory index that must be rebuilt per
+        process. Candidates are confirmed by estimated Jaccard similarity.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of a duplicate
+            embedding_threshold: Minimum cosine similarity for an
+                embedding-based duplicate
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must divide evenly)
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.embedding_threshold = embedding_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Universal hashes (a * x + b) mod p over the Mersenne prime p = 2^61 - 1
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._a_high = a >> np.uint64(32)
+        self._a_low = a & _LOW_32
+        self._b = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def _permute(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        (a * x + b) mod p for every shingle hash x and permutation, exactly
+
+        a * x needs up to 93 bits, so a is split at bit 32 and every partial
+        product is reduced before it can overflow uint64:
+        a * x = a_high * x * 2^32 + a_low * x, and for t < 2^61,
+        t * 2^32 mod p = (t >> 29) + ((t & (2^29 - 1)) << 32) mod p since 2^61 = 1 mod p.
+        """
+        p = np.uint64(_PRIME)
+        x = hashes[:, None]
+        low = (x * self._a_low) % p
+        high = (x * self._a_high) % p
+        high = ((high >> np.uint64(29)) + ((high & _LOW_29) << np.uint64(32))) % p
+        return (low + high + self._b) % p
+
+    def signature(self, document: str) -> np.ndarray:
+        """MinHash signature of a document"""
+        grams = shingles(document)
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+            dtype=np.uint64, count=len(grams)
+        )
+        return self._permute(hashes).min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> Dict[str, str]:
+        """LSH band hashes as metadata entries"""
+        return {
+            f"lsh_band_{band}": hashlib.blake2b(
+                signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        }
+
+    def band_where(self, band_sets: Sequence[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Chroma where clause matching any band of any of several documents
+
+        One $in per band key keeps the clause at `bands` terms however many
+        documents are looked up, which Chroma answers far faster than an $or
+        of every key/value pair.
+        """
+        values: Dict[str, set] = {}
+        for bands in band_sets:
+            for key, value in bands.items():
+                values.setdefault(key, set()).add(value)
+        clauses = [{key: {"$in": sorted(found)}} for key, found in sorted(values.items())]
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+    @staticmethod
+    def same_person(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+        """
+        Allow a merge only between profiles carrying the same name
+
+        A missing name on either side refuses the merge: similar text alone is
+        not evidence that two records describe one person.
+        """
+        a, b = name_key(first.get("name")), name_key(second.get("name"))
+        return bool(a) and a == b
+
+    def closest(self, signature: np.ndarray, metadata: Dict[str, Any],
+                candidates: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Best confirmed duplicate among candidate documents
+
+        Args:
+            signature: Signature of the incoming document
+            metadata: Metadata of the incoming profile
+            candidates: Dicts with "id", "document" and "metadata"
+
+        Returns:
+            The matching candidate with a "similarity" key, or None
+        """
+        best = None
+        for candidate in candidates:
+            if not self.same_person(metadata, candidate.get("metadata") or {}):
+                continue
+            score = self.similarity(signature, self.signature(candidate.get("document") or ""))
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = dict(candidate, similarity=score)
+        return best
+
+    def closest_embedding(self, embedding: Sequence[float], metadata: Dict[str, Any],
+                          candidates: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Best duplicate among candidates by embedding cosine similarity
+
+        Args:
+            embedding: Embedding of the incoming document
+            metadata: Metadata of the incoming profile
+            candidates: Dicts with "id", "embedding" and "metadata"
+
+        Returns:
+            The matching candidate with a "similarity" key, or None
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector) or 1.0
+        best = None
+        for candidate in candidates:
+            if candidate.get("embedding") is None or not self.same_person(metadata, candidate.get("metadata") or {}):
+                continue
+            other = np.asarray(candidate["embedding"], dtype=np.float32)
+            score = float(vector @ other / (norm * (np.linalg.norm(other) or 1.0)))
+            if score >= self.embedding_threshold and (best is None or score > best["similarity"]):
+                best = dict(candidate, similarity=score)
+        return best
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Cache key for an embedding: SHA-256 over the model name and the text"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiskEmbeddingStore:
+    def __init__(self, directory: str):
+        """
+        Append-only on-disk embedding tier
+
+        Vectors are appended as float32 rows to vectors.f32 and read back
+        through a numpy memmap; index.txt maps each key to its row. The
+        vector is written before its index line, so a crash can at worst
+        leave an unreferenced row behind.
+
+        Args:
+            directory: Directory holding vectors.f32 and index.txt
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.index_path = os.path.join(directory, "index.txt")
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._memmap: Optional[np.memmap] = None
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 3:
+                    continue
+                key, row, dim = parts[0], int(parts[1]), int(parts[2])
+                self._index[key] = row
+                self._dim = dim
+                self._rows = max(self._rows, row + 1)
+
+    def _vectors(self) -> Optional[np.memmap]:
+        """Memmap over all rows written so far, remapped when the file grows"""
+        if self._dim is None or self._rows == 0:
+            return None
+        if self._memmap is None or self._memmap.shape[0] < self._rows:
+            self._memmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self._dim))
+        return self._memmap
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                return None
+            vectors = self._vectors()
+            return vectors[row].tolist() if vectors is not None else None
+
+    def put(self, key: str, vector: List[float]):
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if key in self._index:
+                return
+            if self._dim is None:
+                self._dim = int(array.shape[0])
+            elif array.shape[0] != self._dim:
+                logger.warning(f"Skipping embedding with dimension {array.shape[0]}, store uses {self._dim}")
+                return
+            # The vector file may hold orphaned rows from an interrupted write
+            row = os.path.getsize(self.vectors_path) // (4 * self._dim) if os.path.exists(self.vectors_path) else 0
+            with open(self.vectors_path, "ab") as f:
+                f.write(array.tobytes())
+            with open(self.index_path, "a") as f:
+                f.write(f"{key} {row} {self._dim}\n")
+            self._index[key] = row
+            self._rows = row + 1
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class EmbeddingCache:
+    def __init__(self, max_items: int = 10000, directory: Optional[str] = None):
+        """
+        Two-tier embedding cache: in-memory LRU in front of an optional disk store
+
+        Args:
+            max_items: Maximum embeddings held in memory
+            directory: Directory for the persistent tier (None for memory only)
+        """
+        self.max_items = max_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = DiskEmbeddingStore(directory) if directory else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def enable_disk(self, directory: str):
+        """Attach a persistent tier to an existing cache"""
+        self.disk = DiskEmbeddingStore(directory)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                with self._lock:
+                    self.disk_hits += 1
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, vector: List[float]):
+        self._remember(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,192 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from .embedding_cache import EmbeddingCache, embedding_key
+from .metrics import SIZE_BUCKETS, metrics
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CACHE_ITEMS = 10000
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Best-effort resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class EmbeddingService:
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache: Optional[EmbeddingCache] = None):
+        """
+        Lazily loaded sentence-transformer model shared across components
+
+        Args:
+            model_name: Sentence-transformers model to load
+            batch_size: Default batch size for encode_many
+            cache: Embedding cache consulted before running the model
+                (None disables caching)
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.encoded_texts = 0
+        self.encode_seconds = 0.0
+        self._model: Optional["SentenceTransformer"] = None
+        self._lock = threading.Lock()
+        self.load_time: Optional[float] = None
+        self.load_memory_bytes: Optional[int] = None
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """The underlying model, loaded on first access"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Deferred: importing sentence-transformers pulls in torch
+                    from sentence_transformers import SentenceTransformer
+
+                    rss_before = _current_rss_bytes()
+                    start = time.perf_counter()
+                    model = SentenceTransformer(self.model_name)
+                    self.load_time = time.perf_counter() - start
+                    rss_after = _current_rss_bytes()
+                    if rss_before is not None and rss_after is not None:
+                        self.load_memory_bytes = max(rss_after - rss_before, 0)
+                    self._model = model
+                    logger.info(f"Loaded embedding model {self.model_name} in {self.load_time:.2f}s")
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _run_model(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = self.model.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.encoded_texts += len(texts)
+            self.encode_seconds += elapsed
+        metrics.observe("embedding_encode_seconds", elapsed, model=self.model_name)
+        metrics.observe("embedding_batch_size", len(texts), buckets=SIZE_BUCKETS, model=self.model_name)
+        return [vector.tolist() for vector in vectors]
+
+    def encode(self, text: str) -> List[float]:
+        """Encode a single text into an embedding vector"""
+        return self.encode_many([text])[0]
+
+    def encode_many(self, texts: Sequence[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Encode many texts with batched forward passes
+
+        Texts already in the embedding cache skip the model entirely; the
+        remaining ones are encoded together.
+
+        Args:
+            texts: Texts to encode
+            batch_size: Batch size override (defaults to the service batch size)
+
+        Returns:
+            List of embedding vectors in the same order as texts
+        """
+        if not texts:
+            return []
+        texts = list(texts)
+        if self.cache is None:
+            return self._run_model(texts, batch_size or self.batch_size)
+
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            key = embedding_key(self.model_name, text)
+            if key in pending:
+                # Duplicate within the batch: encode once, fan out afterwards
+                pending[key].append(i)
+                continue
+            vector = self.cache.get(key)
+            if vector is not None:
+                results[i] = vector
+            else:
+                pending[key] = [i]
+
+        if metrics.enabled:
+            hits = sum(1 for vector in results if vector is not None)
+            metrics.inc("cache_requests_total", hits, namespace="embeddings", result="hit")
+            metrics.inc("cache_requests_total", len(texts) - hits, namespace="embeddings", result="miss")
+        if pending:
+            keys = list(pending)
+            vectors = self._run_model([texts[pending[key][0]] for key in keys], batch_size or self.batch_size)
+            for key, vector in zip(keys, vectors):
+                self.cache.put(key, vector)
+                for i in pending[key]:
+                    results[i] = vector
+        return results
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Embedding cache hit rate and the encode time it saved"""
+        if self.cache is None:
+            return {"enabled": False}
+        stats = self.cache.stats()
+        per_text = self.encode_seconds / self.encoded_texts if self.encoded_texts else 0.0
+        stats.update(
+            enabled=True,
+            encoded_texts=self.encoded_texts,
+            encode_seconds=self.encode_seconds,
+            saved_encode_seconds=self.cache.hits * per_text,
+        )
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Report load status, load time and memory attributed to the model"""
+        return {
+            "model_name": self.model_name,
+            "loaded": self.is_loaded,
+            "load_time_seconds": self.load_time,
+            "load_memory_bytes": self.load_memory_bytes,
+            "batch_size": self.batch_size,
+            "cache": self.cache_stats(),
+        }
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL_NAME, cache_dir: Optional[str] = None) -> EmbeddingService:
+    """
+    Return the process-wide embedding service for a model, creating it if needed
+
+    Args:
+        model_name: Sentence-transformers model name
+        cache_dir: Directory for a persistent embedding cache tier; attached to
+            the shared service if it does not have one yet
+    """
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = EmbeddingService(model_name, cache=EmbeddingCache(max_items=DEFAULT_CACHE_ITEMS))
+            _services[model_name] = service
+        if cache_dir and service.cache is not None and service.cache.disk is None:
+            service.cache.enable_disk(cache_dir)
+        return service
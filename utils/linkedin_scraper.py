@@ -1,31 +1,75 @@
+import itertools
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
-from typing import List, Dict, Any, Optional
-from googlesearch import search
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional, Callable, Iterable
+from .cache import PersistentCache, cache_key
+from .embeddings import EmbeddingService, get_embedding_service
+from .metrics import SIZE_BUCKETS, metrics
+from .profile_document import build_profile_document, document_hash
+from .rate_limit import RateLimiter, RetryableError, RETRYABLE_STATUS_CODES, get_rate_limiter, parse_retry_after
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def google_search_backend(query: str, num_results: int, start: int = 0) -> Iterable[str]:
+    """Default search backend: result URLs from googlesearch, starting at result `start`"""
+    from googlesearch import search
+
+    # googlesearch sizes each page as num_results - start_num, so the window
+    # must end at start + num_results; otherwise deep pages ask for few or a
+    # negative number of results
+    return itertools.islice(search(query, num_results=start + num_results, lang="en", start_num=start),
+                            num_results)
+
 class LinkedInScraper:
-    def __init__(self, api_key: str, api_host: str = "linkedin-api8.p.rapidapi.com"):
+    def __init__(self, api_key: str, api_host: str = "linkedin-api8.p.rapidapi.com",
+                 embedder: Optional[EmbeddingService] = None, max_workers: int = 8,
+                 timeout: float = 15.0, api_url: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[PersistentCache] = None,
+                 search_cache: Optional[PersistentCache] = None,
+                 search_backend: Optional[Callable[[str, int, int], Iterable[str]]] = None):
         """
         Initialize the LinkedIn scraper with RapidAPI credentials
         
         Args:
             api_key: RapidAPI key for LinkedIn API
             api_host: RapidAPI host for LinkedIn API
+            embedder: Embedding service (defaults to the shared process-wide one)
+            max_workers: Maximum number of concurrent profile requests
+            timeout: Per-request timeout in seconds
+            api_url: Override for the API endpoint (e.g. a local stub server)
+            rate_limiter: Limiter for RapidAPI calls (defaults to the shared "rapidapi" one)
+            cache: Optional on-disk cache for raw profile responses
+            search_cache: Optional cache of usernames found per search query
+            search_backend: Callable (query, num_results, start) -> result URLs;
+                defaults to googlesearch
         """
-        self.api_url = f"https://{api_host}/"
+        self.api_url = api_url or f"https://{api_host}/"
         self.headers = {
             "x-rapidapi-key": api_key,
             "x-rapidapi-host": api_host
         }
-        # Initialize embedding model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        
+        # Keep-alive session whose connection pool fits the worker count
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+        self.rate_limiter = rate_limiter or get_rate_limiter("rapidapi")
+        self.cache = cache
+        self.search_cache = search_cache
+        self.search_backend = search_backend or google_search_backend
+        # Shared embedding model, loaded lazily on first use
+        self.embedder = embedder or get_embedding_service()
     
-    def find_profiles(self, job_role: str, location: str = None, num_results: int = 5) -> List[str]:
+    def find_profiles(self, job_role: str, location: str = None, num_results: int = 5,
+                      incremental: bool = False) -> List[str]:
         """
         Use Google dorking to find LinkedIn profiles matching criteria
         
@@ -33,6 +77,8 @@ class LinkedInScraper:
             job_role: The job role to search for
             location: Optional location filter
             num_results: Number of results to return
+            incremental: Page past results scanned by earlier calls and return
+                only newly discovered usernames
             
         Returns:
             List of LinkedIn usernames
@@ -40,73 +86,171 @@ class LinkedInScraper:
         location_term = f'"{location}"' if location else ""
         query = f'site:linkedin.com/in/ "{job_role}" {location_term} -jobs -careers'
         
-        return self.extract_linkedin_usernames(query, num_results)
+        return self.extract_linkedin_usernames(query, num_results, incremental=incremental)
         
-    def extract_linkedin_usernames(self, query: str, num_results: int = 5) -> List[str]:
+    @staticmethod
+    def _username_from_url(url: str) -> Optional[str]:
+        """Return the LinkedIn username in a /in/<username> URL, if any"""
+        # Check if the URL contains '/in/'
+        if "linkedin.com/in/" not in url:
+            return None
+        # Split the path and filter out empty strings
+        parts = [p for p in urlparse(url).path.strip("/").split("/") if p]
+        # We expect the first part to be "in" and the second part to be the username
+        if parts and parts[0].lower() == "in" and len(parts) >= 2:
+            return parts[1] or None
+        logger.debug("URL did not have the expected structure: %s", url)
+        return None
+        
+    def extract_linkedin_usernames(self, query: str, num_results: int = 5, incremental: bool = False) -> List[str]:
         """
         Extract LinkedIn usernames from Google search results
         
+        Results are cached per normalized query. A cached query that already
+        scanned num_results results is answered without searching again.
+        
         Args:
             query: Google dork query
             num_results: Number of search results to process
+            incremental: Continue from where earlier calls for this query
+                stopped and return only usernames not returned before
             
         Returns:
             List of LinkedIn usernames
         """
+        normalized = " ".join(query.lower().split())
+        key = cache_key("google_search", normalized)
+        entry = None
+        if self.search_cache is not None:
+            entry = self.search_cache.get(key)
+        entry = entry or {"usernames": [], "scanned": 0}
+        known = list(entry["usernames"])
+        
+        if not incremental and entry["scanned"] >= num_results:
+            logger.info("Search cache hit for query: %s", query)
+            return known[:num_results]
+            
+        # Fresh lookups rescan from the top; incremental ones page further in
+        start = entry["scanned"] if incremental else 0
         usernames = []
-        logger.info("Searching Google with query: %s", query)
+        logger.info("Searching Google with query: %s (from result %d)", query, start)
         
         try:
-            for url in search(query, num_results=num_results, lang="en"):
-                parsed_url = urlparse(url)
-                # Check if the URL contains '/in/'
-                if "linkedin.com/in/" in url:
-                    # Split the path and filter out empty strings
-                    parts = [p for p in parsed_url.path.strip("/").split("/") if p]
-                    # We expect the first part to be "in" and the second part to be the username
-                    if parts and parts[0].lower() == "in" and len(parts) >= 2:
-                        username = parts[1]
-                        if username and username not in usernames:
-                            usernames.append(username)
-                    else:
-                        logger.debug("URL did not have the expected structure: %s", url)
-                        
-            logger.info("Extracted LinkedIn usernames: %s", usernames)
-            return usernames
+            scanned = 0
+            with metrics.timer("google_search"):
+                for url in self.search_backend(query, num_results, start):
+                    scanned += 1
+                    username = self._username_from_url(url)
+                    if username and username not in usernames:
+                        usernames.append(username)
         except Exception as e:
             logger.error(f"Error extracting LinkedIn usernames: {e}")
             return []
+            
+        logger.info("Extracted LinkedIn usernames: %s", usernames)
+        
+        if incremental:
+            usernames = [u for u in usernames if u not in known]
+            known.extend(usernames)
+            entry = {"usernames": known, "scanned": start + max(scanned, num_results)}
+        else:
+            entry = {"usernames": usernames + [u for u in known if u not in usernames],
+                     "scanned": max(entry["scanned"], num_results)}
+        if self.search_cache is not None:
+            self.search_cache.set(key, entry)
+            
+        return usernames
     
-    def get_profile_details(self, username: str) -> Optional[Dict[str, Any]]:
+    def get_profile_details(self, username: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
         Retrieve profile details for a LinkedIn username using RapidAPI
         
         Args:
             username: LinkedIn username/profile ID
+            max_age: Refetch if the cached response is older than this many
+                seconds (defaults to the cache TTL)
             
         Returns:
             Dictionary containing profile data or None if retrieval failed
         """
+        key = cache_key("linkedin_profile", username.strip().lower())
+        if self.cache is not None:
+            cached = self.cache.get(key, max_age=max_age)
+            if cached is not None:
+                logger.debug(f"Profile cache hit for username: {username}")
+                return cached
+                
         querystring = {"username": username}
         logger.info(f"Fetching profile for username: {username}")
         
+        def fetch():
+            response = self.session.get(self.api_url, params=querystring, timeout=self.timeout)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableError(
+                    f"HTTP {response.status_code}",
+                    status_code=response.status_code,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                )
+            return response
+        
         try:
-            response = requests.get(self.api_url, headers=self.headers, params=querystring)
+            with metrics.timer("rapidapi_request"):
+                response = self.rate_limiter.call(fetch)
+            metrics.inc("rapidapi_responses_total", status=response.status_code)
             if response.status_code == 200:
-                return response.json()
+                profile = response.json()
+                if self.cache is not None:
+                    self.cache.set(key, profile)
+                return profile
             else:
                 logger.warning(f"Failed to get profile for {username}, status code: {response.status_code}")
                 return None
         except Exception as e:
             logger.error(f"Error retrieving profile for {username}: {e}")
             return None
+    
+    def get_profiles_details(self, usernames: List[str], max_workers: Optional[int] = None,
+                             max_age: Optional[float] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieve profile details for many usernames concurrently
+        
+        Requests share the pooled session, so total latency is bounded by the
+        slowest request rather than the sum of all of them.
+        
+        Args:
+            usernames: LinkedIn usernames/profile IDs
+            max_workers: Concurrency limit override (defaults to the scraper's)
+            max_age: Refetch cached responses older than this many seconds
+            
+        Returns:
+            Profile data (or None on failure) for each username, in input order
+        """
+        if not usernames:
+            return []
+        metrics.observe("rapidapi_batch_size", len(usernames), buckets=SIZE_BUCKETS)
             
-    def process_profile(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
+        def fetch(username: str) -> Optional[Dict[str, Any]]:
+            return self.get_profile_details(username, max_age=max_age)
+            
+        workers = min(max_workers or self.max_workers, len(usernames))
+        if workers <= 1:
+            return [fetch(username) for username in usernames]
+            
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linkedin-fetch") as executor:
+            return list(executor.map(fetch, usernames))
+    
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.session.close()
+            
+    def process_profile(self, profile_data: Dict[str, Any], embed: bool = True) -> Dict[str, Any]:
         """
         Process raw profile data into a structured format
         
         Args:
             profile_data: Raw profile data from API
+            embed: Compute the embedding now; pass False when the profile goes
+                straight to ProfileVectorStore, which only embeds changed profiles
             
         Returns:
             Processed profile with relevant fields extracted and embedding
@@ -114,49 +258,36 @@ class LinkedInScraper:
         if not profile_data:
             return {}
             
-        # Extract basic info and create profile text as in agent.py
-        profile_text = f"{profile_data.get('name', '')}\n{profile_data.get('headline', '')}\n{profile_data.get('summary', '')}"
+        username = profile_data.get('username', '')
+        url = f"https://www.linkedin.com/in/{username}"
         
-        # Create the structured profile
+        # Create the structured profile; "title"/"url" mirror the fields the
+        # vector store reads so both sides build the same document
         processed = {
-            "username": profile_data.get('username', ''),
-            "profile_text": profile_text,
-            "source_url": f"https://www.linkedin.com/in/{profile_data.get('username', '')}",
+            "username": username,
+            "source_url": url,
+            "url": url,
             "name": profile_data.get('name', ''),
             "headline": profile_data.get('headline', ''),
-            "summary": profile_data.get('summary', '')
+            "title": profile_data.get('headline', ''),
+            "summary": profile_data.get('summary', ''),
+            "location": (profile_data.get('geo') or {}).get('full', '') or profile_data.get('location', '')
         }
         
-        # Extract experience details if available
-        if 'experience' in profile_data:
-            processed['experience'] = profile_data.get('experience', [])
-            
-            # Add experience details to profile text
-            for exp in processed['experience']:
-                profile_text += f"\nRole: {exp.get('title', '')}\nCompany: {exp.get('company', '')}\n"
-                if 'date_range' in exp:
-                    profile_text += f"Duration: {exp.get('date_range', '')}\n"
-                if 'description' in exp:
-                    profile_text += f"Description: {exp.get('description', '')}\n"
-        
-        # Extract education details if available
-        if 'education' in profile_data:
-            processed['education'] = profile_data.get('education', [])
-            
-            # Add education details to profile text
-            for edu in processed['education']:
-                profile_text += f"\nEducation: {edu.get('school', '')}, {edu.get('degree', '')}, {edu.get('field', '')}\n"
-        
-        # Extract skills if available
-        if 'skills' in profile_data:
-            processed['skills'] = profile_data.get('skills', [])
-            profile_text += f"\nSkills: {', '.join(processed['skills'])}"
+        # Extract experience, education and skills if available
+        for key in ('experience', 'education', 'skills'):
+            if key in profile_data:
+                processed[key] = profile_data.get(key) or []
         
-        # Update the profile text with all the additional information
+        # Build the canonical document shared with ProfileVectorStore
+        profile_text = build_profile_document(processed)
         processed["profile_text"] = profile_text
         
-        # Generate embedding
-        processed["embedding"] = self.model.encode(profile_text).tolist()
+        # Generate embedding, tagged so the vector store can reuse it
+        if embed:
+            processed["embedding"] = self.embedder.encode(profile_text)
+            processed["embedding_model"] = self.embedder.model_name
+            processed["document_hash"] = document_hash(profile_text)
         
         return processed
         
@@ -177,8 +308,7 @@ class LinkedInScraper:
         
         # Get and process profiles
         profiles = []
-        for username in usernames:
-            profile_json = self.get_profile_details(username)
+        for profile_json in self.get_profiles_details(usernames):
             if profile_json:
                 processed_profile = self.process_profile(profile_json)
                 if processed_profile:
@@ -0,0 +1,95 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .cache import PersistentCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CACHE_PATH = "./data/cache/llm_cache.sqlite3"
+
+
+def model_name_of(llm: Any) -> str:
+    """Identify a chat model for cache keys (LangChain models expose model or model_name)"""
+    for attr in ("model", "model_name"):
+        name = getattr(llm, attr, None)
+        if isinstance(name, str) and name:
+            return name
+    return type(llm).__name__
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = DEFAULT_LLM_CACHE_PATH, ttl: Optional[float] = 7 * 24 * 3600,
+                 max_bytes: Optional[int] = 200 * 1024 * 1024, bypass: bool = False):
+        """
+        Persistent prompt-response cache for LLM calls
+
+        Entries are keyed by model, prompt template version and a hash of the
+        prompt inputs, so bumping a template version invalidates its answers.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds before a cached answer is considered stale
+            max_bytes: Compressed size budget before LRU eviction
+            bypass: Skip lookups for every call (fresh answers are still stored)
+        """
+        self.store = PersistentCache(path, namespace="llm_responses", ttl=ttl, max_bytes=max_bytes)
+        self.bypass = bypass
+
+    def key(self, model: str, template_version: str, inputs: Dict[str, Any]) -> str:
+        return cache_key("llm", model, template_version, inputs)
+
+    def lookup(self, model: str, template_version: str, inputs: Dict[str, Any], bypass: bool = False) -> Optional[str]:
+        """Cached response for these inputs, or None on a miss or when bypassed"""
+        if bypass or self.bypass:
+            return None
+        return self.store.get(self.key(model, template_version, inputs))
+
+    def store_response(self, model: str, template_version: str, inputs: Dict[str, Any], response: str):
+        """Record a response obtained outside get_or_call, e.g. from a stream"""
+        self.store.set(self.key(model, template_version, inputs), response)
+
+    def get_or_call(self, model: str, template_version: str, inputs: Dict[str, Any],
+                    call: Callable[[], str], bypass: bool = False) -> str:
+        """
+        Return the cached response for these inputs, or call the model and cache its answer
+
+        Args:
+            model: Model name
+            template_version: Version tag of the prompt template that produced the prompt
+            inputs: Everything that varies between prompts of this template
+            call: Zero-argument function that queries the model and returns text
+            bypass: Force a fresh call for this request only
+        """
+        cached = self.lookup(model, template_version, inputs, bypass)
+        if cached is not None:
+            return cached
+        response = call()
+        self.store_response(model, template_version, inputs, response)
+        return response
+
+    async def aget_or_call(self, model: str, template_version: str, inputs: Dict[str, Any],
+                           call: Callable[[], Any], bypass: bool = False) -> str:
+        """Async counterpart of get_or_call; call returns an awaitable of text"""
+        cached = self.lookup(model, template_version, inputs, bypass)
+        if cached is not None:
+            return cached
+        response = await call()
+        self.store_response(model, template_version, inputs, response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
@@ -0,0 +1,87 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    from langchain.prompts import ChatPromptTemplate
+    from langchain_mistralai.chat_models import ChatMistralAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "mistral/mistral-large-latest"
+
+_lock = threading.RLock()
+_llms: Dict[Hashable, "ChatMistralAI"] = {}
+_prompts: Dict[str, "ChatPromptTemplate"] = {}
+_chains: Dict[Hashable, Any] = {}
+_constructions: Counter = Counter()
+
+
+def get_llm(model: Optional[str] = DEFAULT_MODEL, api_key: Optional[str] = None, **kwargs: Any) -> "ChatMistralAI":
+    """
+    Return the process-wide ChatMistralAI client for a model
+
+    Reusing one client per model also reuses its HTTP connection pool.
+    langchain_mistralai is imported on the first call, not at import time.
+
+    Args:
+        model: Mistral model name (None for the library default)
+        api_key: API key (defaults to MISTRAL_API_KEY)
+        **kwargs: Extra client options; part of the cache key
+    """
+    api_key = api_key or os.getenv("MISTRAL_API_KEY")
+    # Key on a digest so the raw API key is not kept around as a dict key
+    key_digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    key = (model, key_digest, tuple(sorted(kwargs.items())))
+    with _lock:
+        llm = _llms.get(key)
+        if llm is None:
+            options = dict(kwargs)
+            if model is not None:
+                options["model"] = model
+            from langchain_mistralai.chat_models import ChatMistralAI
+
+            llm = ChatMistralAI(api_key=api_key, **options)
+            _llms[key] = llm
+            _constructions["llm"] += 1
+            logger.debug(f"Constructed ChatMistralAI client for {model}")
+        return llm
+
+
+def get_prompt(template: str) -> "ChatPromptTemplate":
+    """Return the parsed ChatPromptTemplate for a template string, parsing it once"""
+    with _lock:
+        prompt = _prompts.get(template)
+        if prompt is None:
+            from langchain.prompts import ChatPromptTemplate
+
+            prompt = ChatPromptTemplate.from_template(template)
+            _prompts[template] = prompt
+            _constructions["prompt"] += 1
+        return prompt
+
+
+def get_chain(key: Hashable, builder: Callable[[], Any]) -> Any:
+    """
+    Return the runnable registered under key, building it on first use
+
+    Args:
+        key: Identifies the chain, e.g. ("rag_stuff", model)
+        builder: Zero-argument function that constructs the chain
+    """
+    with _lock:
+        chain = _chains.get(key)
+        if chain is None:
+            chain = builder()
+            _chains[key] = chain
+            _constructions["chain"] += 1
+        return chain
+
+
+def construction_counts() -> Dict[str, int]:
+    """How many clients, prompts and chains have been built in this process"""
+    with _lock:
+        return {kind: _constructions[kind] for kind in ("llm", "prompt", "chain")}
@@ -0,0 +1,281 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans a cache hit to a slow LLM call
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.registry.inc(f"{self.name}_errors_total", **self.labels)
+        self.registry.observe(f"{self.name}_seconds", time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        """
+        In-process counters and histograms
+
+        Every recording method returns immediately while disabled, and timer()
+        hands out a shared no-op context manager, so instrumented hot paths
+        cost one attribute check when metrics are off.
+
+        Args:
+            enabled: Start recording immediately
+        """
+        self.enabled = enabled
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: Any):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: Any):
+        """Record a value in a histogram (buckets are fixed on first use)"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels: Any):
+        """
+        Context manager recording elapsed time in "<name>_seconds"
+
+        Exceptions also count towards "<name>_errors_total".
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series as plain data"""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key),
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "mean": round(h.sum / h.count, 6) if h.count else None,
+                    "buckets": {str(bound): count for bound, count in zip(h.buckets + ("+Inf",), h.counts)},
+                } for key, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump_json(self, path: str):
+        """Write the snapshot to a JSON file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def to_prometheus(self, prefix: str = "hirely_") -> str:
+        """Prometheus text exposition format"""
+        def labels_text(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{prefix}{name}{labels_text(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(h.buckets + ("+Inf",), h.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}{name}_bucket{labels_text(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{labels_text(key)} {h.sum}")
+                    lines.append(f"{prefix}{name}_count{labels_text(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics in Prometheus text format from a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+metrics = MetricsRegistry()
+
+
+def record_llm_usage(model: str, response: Any, operation: str):
+    """
+    Count tokens in/out from a LangChain chat response when it reports usage
+
+    Args:
+        model: Model name label
+        response: AIMessage (usage_metadata or response_metadata["token_usage"])
+        operation: What the call was for, e.g. "rag_map"
+    """
+    if not metrics.enabled:
+        return
+    usage = getattr(response, "usage_metadata", None) or {}
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    tokens_in = usage.get("input_tokens", token_usage.get("prompt_tokens"))
+    tokens_out = usage.get("output_tokens", token_usage.get("completion_tokens"))
+    if tokens_in is not None:
+        metrics.inc("llm_tokens_in_total", tokens_in, model=model, operation=operation)
+        metrics.observe("llm_prompt_tokens", tokens_in, buckets=TOKEN_BUCKETS, model=model, operation=operation)
+    if tokens_out is not None:
+        metrics.inc("llm_tokens_out_total", tokens_out, model=model, operation=operation)
+
+
+_callback_class = None
+
+
+def llm_callbacks(model: str, operation: str) -> List[Any]:
+    """
+    LangChain callbacks that record token usage of LLM calls inside a chain
+
+    Returns an empty list while metrics are disabled, so passing the result
+    as config={"callbacks": ...} costs nothing then.
+    """
+    global _callback_class
+    if not metrics.enabled:
+        return []
+    if _callback_class is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class MetricsCallbackHandler(BaseCallbackHandler):
+            def __init__(self, model: str, operation: str):
+                self.model = model
+                self.operation = operation
+
+            def on_llm_end(self, response, **kwargs):
+                for generations in response.generations:
+                    for generation in generations:
+                        message = getattr(generation, "message", None)
+                        if message is not None:
+                            record_llm_usage(self.model, message, self.operation)
+
+        _callback_class = MetricsCallbackHandler
+    return [_callback_class(model, operation)]
+
+
+def configure_from_env():
+    """
+    Enable metrics from environment variables
+
+    HIRELY_METRICS=1 turns recording on, HIRELY_METRICS_PORT serves a
+    Prometheus endpoint and HIRELY_METRICS_JSON names a file the JSON
+    snapshot is written to at exit.
+    """
+    port = os.getenv("HIRELY_METRICS_PORT")
+    json_path = os.getenv("HIRELY_METRICS_JSON")
+    if os.getenv("HIRELY_METRICS", "").lower() not in ("1", "true", "yes") and not port and not json_path:
+        return
+    metrics.enabled = True
+    if port:
+        metrics.serve_prometheus(int(port))
+    if json_path:
+        atexit.register(metrics.dump_json, json_path)
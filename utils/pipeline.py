@@ -0,0 +1,213 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .metrics import metrics
+from .screening import run_sync
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1, queue_size: int = 16):
+        """
+        One step of a pipeline
+
+        Args:
+            name: Stage name used in stats and logs
+            fn: Sync or async callable taking an item and returning the item
+                for the next stage; returning None drops the item
+            workers: Number of concurrent workers for this stage
+            queue_size: Capacity of the queue feeding this stage
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.is_async = inspect.iscoroutinefunction(fn)
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def as_dict(self, queue_depth: int) -> Dict[str, Any]:
+        active = (self.last_end - self.first_start) if self.first_start and self.last_end else 0.0
+        return {
+            "stage": self.name,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "throughput_per_second": round(self.processed / active, 3) if active > 0 else None,
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class PipelineRunner:
+    def __init__(self, stages: List[Stage]):
+        """
+        Streams items through stages connected by bounded queues
+
+        Every stage has its own worker pool, so an item moves on as soon as
+        its current stage finishes with it instead of waiting for the whole
+        batch. Bounded queues apply back-pressure to faster upstream stages.
+
+        Args:
+            stages: Stages in processing order
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self._stats = [StageStats(stage.name) for stage in stages]
+        self._queues: List[asyncio.Queue] = []
+        self.failures: List[Dict[str, Any]] = []
+
+    async def _worker(self, index: int, results: List[Any]):
+        stage = self.stages[index]
+        stats = self._stats[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            if stats.first_start is None:
+                stats.first_start = start
+            try:
+                if stage.is_async:
+                    output = await stage.fn(item)
+                else:
+                    output = await asyncio.to_thread(stage.fn, item)
+            except Exception as e:
+                stats.failed += 1
+                metrics.inc("pipeline_stage_failures_total", stage=stage.name)
+                self.failures.append({"stage": stage.name, "item": item, "error": str(e)})
+                logger.warning(f"Pipeline stage {stage.name} failed: {e}")
+                output = None
+            else:
+                stats.processed += 1
+                if output is None:
+                    stats.dropped += 1
+            finally:
+                end = time.perf_counter()
+                stats.busy_seconds += end - start
+                stats.last_end = end
+                metrics.observe("pipeline_stage_seconds", end - start, stage=stage.name)
+
+            if output is None:
+                continue
+            if outbox is None:
+                results.append(output)
+            else:
+                await outbox.put(output)
+                stats_next = self._stats[index + 1]
+                stats_next.max_queue_depth = max(stats_next.max_queue_depth, outbox.qsize())
+
+    async def arun(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Run items through every stage
+
+        Args:
+            items: Inputs for the first stage
+
+        Returns:
+            Outputs of the last stage, in completion order; failed items are
+            recorded in self.failures
+        """
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        results: List[Any] = []
+        pools = [
+            [asyncio.create_task(self._worker(i, results)) for _ in range(stage.workers)]
+            for i, stage in enumerate(self.stages)
+        ]
+
+        for item in items:
+            await self._queues[0].put(item)
+            self._stats[0].max_queue_depth = max(self._stats[0].max_queue_depth, self._queues[0].qsize())
+
+        # Shut stages down in order so every item drains before the next stage stops
+        for i, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                await self._queues[i].put(_DONE)
+            await asyncio.gather(*pools[i])
+        return results
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Blocking wrapper around arun"""
+        return run_sync(self.arun(items))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-stage counts, throughput and queue depth"""
+        return [
+            stats.as_dict(self._queues[i].qsize() if self._queues else 0)
+            for i, stats in enumerate(self._stats)
+        ]
+
+
+def profile_ingest_stages(scraper: Any, vector_store: Any, fetch_workers: int = 4,
+                          max_age: Optional[float] = None) -> List[Stage]:
+    """
+    Stages turning LinkedIn usernames into stored, embedded candidates
+
+    Put them in front of a screening stage so each profile is scored as soon
+    as it is stored instead of after the whole scrape. Items that already are
+    candidates (dicts with a "document") pass straight through.
+
+    Args:
+        scraper: LinkedInScraper that fetches and processes the profiles
+        vector_store: ProfileVectorStore the profiles are written to
+        fetch_workers: Concurrent RapidAPI requests
+        max_age: Refetch cached profiles older than this many seconds
+
+    Returns:
+        "fetch", "embed" and "store" stages; the last one emits candidate
+        dicts with "id", "document", "metadata", "embedding" and the store
+        "status", and drops profiles merged into a stored duplicate
+    """
+    def fetch(item: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(item, dict):
+            return item
+        return scraper.get_profile_details(item, max_age=max_age) or None
+
+    def embed(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "document" in item:
+            return item
+        return scraper.process_profile(item) or None
+
+    def store(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "document" in item:
+            return item
+        result = vector_store.add_profiles([item])[0]
+        if not result["success"]:
+            raise RuntimeError(f"Could not store {result['username']}: {result['error']}")
+        if result["status"] == "duplicate":
+            logger.info(f"{result['username']} merged into {result['duplicate_of']}, not screened again")
+            return None
+        return {
+            "id": result["id"],
+            "document": item["profile_text"],
+            "metadata": vector_store._create_metadata(item),
+            "embedding": item["embedding"],
+            "status": result["status"],
+        }
+
+    return [
+        Stage("fetch", fetch, workers=fetch_workers),
+        # The embedding model and the Chroma writer each get a single worker
+        Stage("embed", embed),
+        Stage("store", store),
+    ]
@@ -0,0 +1,143 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .bm25 import tokenize
+from .embeddings import EmbeddingService, get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it of on or our the this to we with you your
+will who what which looking join team experience experienced strong good knowledge understanding
+familiarity skills skill years year plus preferred required requirements requirement working work
+ability able using use including etc
+""".split())
+
+
+def keyword_terms(text: str) -> Set[str]:
+    """Lowercased content terms of a text, without stopwords"""
+    return {t for t in tokenize(text) if t not in _STOPWORDS and len(t) > 1}
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class CandidatePrefilter:
+    def __init__(self, embedder: Optional[EmbeddingService] = None, top_k: Optional[int] = 20,
+                 min_score: Optional[float] = None, similarity_weight: float = 0.7,
+                 keyword_weight: float = 0.3):
+        """
+        Cheap first-tier screening before any LLM call
+
+        Candidates are scored by cosine similarity between their embedding and
+        the job description embedding, blended with the share of job keywords
+        found in their document. Only the top_k candidates at or above
+        min_score survive.
+
+        Args:
+            embedder: Embedding service (defaults to the shared process-wide one)
+            top_k: Maximum survivors (None for no budget)
+            min_score: Minimum blended score (None for no threshold)
+            similarity_weight: Weight of the cosine similarity
+            keyword_weight: Weight of the keyword overlap
+        """
+        self.embedder = embedder or get_embedding_service()
+        self.top_k = top_k
+        self.min_score = min_score
+        self.similarity_weight = similarity_weight
+        self.keyword_weight = keyword_weight
+
+    def score(self, job_description: str, candidates: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Blended prefilter scores for candidates
+
+        Args:
+            job_description: Text the candidates are matched against
+            candidates: Dicts with "document" and optionally "embedding";
+                missing embeddings are computed in one batch
+
+        Returns:
+            Array of scores aligned with candidates
+        """
+        if not candidates:
+            return np.zeros(0, dtype=np.float32)
+
+        missing = [i for i, c in enumerate(candidates) if c.get("embedding") is None]
+        computed = self.embedder.encode_many([candidates[i].get("document", "") for i in missing])
+        vectors = [c.get("embedding") for c in candidates]
+        for i, vector in zip(missing, computed):
+            vectors[i] = vector
+
+        matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        job_vector = np.asarray(self.embedder.encode(job_description), dtype=np.float32)
+        job_vector /= np.linalg.norm(job_vector) or 1.0
+        similarity = matrix @ job_vector
+
+        job_terms = keyword_terms(job_description)
+        if job_terms:
+            overlap = np.fromiter(
+                (len(job_terms & keyword_terms(c.get("document", ""))) / len(job_terms) for c in candidates),
+                dtype=np.float32, count=len(candidates)
+            )
+        else:
+            overlap = np.zeros(len(candidates), dtype=np.float32)
+
+        return self.similarity_weight * similarity + self.keyword_weight * overlap
+
+    def _select(self, scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        """Indices of surviving candidates, best first"""
+        keep = np.arange(len(scores))
+        if self.min_score is not None:
+            keep = keep[scores >= self.min_score]
+        if top_k is not None and len(keep) > top_k:
+            keep = keep[np.argpartition(-scores[keep], top_k - 1)[:top_k]]
+        return keep[np.argsort(-scores[keep], kind="stable")]
+
+    def shortlist(self, job_description: str, candidates: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter candidates down to those worth an LLM screening
+
+        Args:
+            job_description: Text the candidates are matched against
+            candidates: Candidate dicts with "document", "metadata" and
+                optionally "embedding"
+
+        Returns:
+            Surviving candidates, best first, each with a "prefilter_score"
+        """
+        scores = self.score(job_description, candidates)
+        selected = self._select(scores, self.top_k)
+        logger.info(f"Prefilter kept {len(selected)}/{len(candidates)} candidates")
+        return [dict(candidates[i], prefilter_score=float(scores[i])) for i in selected]
+
+    def shortlist_store(self, vector_store: Any, job_description: str, batch_size: int = 2000) -> List[Dict[str, Any]]:
+        """
+        Scan every profile in a ProfileVectorStore and shortlist the best
+
+        Stored embeddings are scored page by page, keeping only the running
+        top_k, so memory stays bounded regardless of store size.
+
+        Args:
+            vector_store: ProfileVectorStore to scan
+            job_description: Text the candidates are matched against
+            batch_size: Profiles scored per vectorized batch
+
+        Returns:
+            Surviving candidates, best first, each with a "prefilter_score"
+        """
+        kept: List[Dict[str, Any]] = []
+        scanned = 0
+        for page in vector_store.iter_profiles(batch_size=batch_size):
+            scanned += len(page)
+            scores = self.score(job_description, page)
+            page_kept = [dict(page[i], prefilter_score=float(scores[i])) for i in self._select(scores, self.top_k)]
+            kept = sorted(kept + page_kept, key=lambda c: -c["prefilter_score"])
+            if self.top_k is not None:
+                kept = kept[:self.top_k]
+        logger.info(f"Prefilter kept {len(kept)}/{scanned} stored profiles")
+        return kept
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+
+def build_profile_document(profile: Dict[str, Any]) -> str:
+    """
+    Build the canonical text document for a profile
+
+    This is the single source of truth for the text that gets embedded, so the
+    scraper and the vector store always encode exactly the same string.
+
+    Args:
+        profile: Processed profile data dictionary
+
+    Returns:
+        Text document describing the profile
+    """
+    title = profile.get('title') or profile.get('headline', '')
+    doc = f"{profile.get('name', '')}\n{title}\n\n"
+
+    # Add summary
+    if profile.get('summary'):
+        doc += f"Summary: {profile.get('summary')}\n\n"
+
+    # Add experience
+    doc += "Experience:\n"
+    for exp in profile.get('experience') or []:
+        doc += f"- {exp.get('title', '')} at {exp.get('company', '')}, {exp.get('date_range', '')}\n"
+        if exp.get('description'):
+            doc += f"  {exp.get('description')}\n"
+
+    # Add education
+    doc += "\nEducation:\n"
+    for edu in profile.get('education') or []:
+        doc += f"- {edu.get('degree', '')} in {edu.get('field', '')} from {edu.get('school', '')}, {edu.get('date_range', '')}\n"
+
+    # Add skills
+    doc += f"\nSkills: {', '.join(profile.get('skills') or [])}"
+
+    return doc
+
+
+def document_hash(document: str) -> str:
+    """Stable content hash of a profile document"""
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """
+    Hash of everything stored for a profile, used to detect changes on re-ingest
+
+    Args:
+        document: Profile document text
+        metadata: Metadata stored alongside it (any existing content_hash is ignored)
+
+    Returns:
+        Hex digest that changes whenever the document or metadata change
+    """
+    fields = {k: v for k, v in metadata.items() if k != "content_hash"}
+    payload = document + "\0" + json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def reusable_embedding(profile: Dict[str, Any], document: str, model_name: str) -> Optional[List[float]]:
+    """
+    Return the profile's precomputed embedding if it was built from this exact document
+
+    Args:
+        profile: Processed profile data dictionary
+        document: Document the caller is about to embed
+        model_name: Embedding model the caller would use
+
+    Returns:
+        The stored embedding, or None if it is missing or stale
+    """
+    embedding = profile.get('embedding')
+    if not embedding:
+        return None
+    if profile.get('embedding_model') != model_name:
+        return None
+    if profile.get('document_hash') != document_hash(document):
+        return None
+    return embedding
@@ -0,0 +1,166 @@
+import datetime
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+_DATE_RE = re.compile(r"(?:([a-z]{3})[a-z]*\.?\s+)?((?:19|20)\d{2})", re.IGNORECASE)
+
+MAX_SKILL_FLAGS = 100
+MAX_TITLE_FLAGS = 30
+
+
+_OPEN_ENDED_RE = re.compile(r"\b(?:present|current|now)\b", re.IGNORECASE)
+_QUALIFIER_RE = re.compile(r"\([^)]*\)")
+
+
+def metadata_slug(value: str) -> str:
+    """
+    Normalize a skill or place name into a metadata key suffix
+
+    Parenthesised qualifiers are dropped, so LinkedIn's "Python (Programming
+    Language)" and a plain "Python" filter share the slug "python".
+    """
+    return re.sub(r"[^a-z0-9]+", "_", _QUALIFIER_RE.sub(" ", value).strip().lower()).strip("_")
+
+
+def title_words(title: str) -> List[str]:
+    """Distinct normalized words of a title or headline, in order"""
+    return [word for word in dict.fromkeys(metadata_slug(title).split("_")) if word]
+
+
+def _parse_range(date_range: str) -> Optional[Tuple[float, Optional[float]]]:
+    """Parse "Jan 2019 - Present" / "2015 - 2018" into fractional years (end None while ongoing)"""
+    points = []
+    for month, year in _DATE_RE.findall(date_range):
+        points.append(int(year) + (_MONTHS.get(month[:3].lower(), 1) - 1) / 12)
+    if not points:
+        return None
+    if len(points) == 1:
+        return (points[0], None) if _OPEN_ENDED_RE.search(date_range) else None
+    start, end = points[0], points[1]
+    return (start, end) if end >= start else None
+
+
+def _experience_spans(experience: Sequence[Dict[str, Any]]) -> Tuple[float, Optional[float]]:
+    """
+    Merge experience entries into finished years plus the start of the ongoing stretch
+
+    Overlapping roles are merged so concurrent positions are not double counted.
+
+    Returns:
+        (years in finished stretches, start of the stretch still running or None)
+    """
+    spans = [span for span in (_parse_range(str(exp.get("date_range") or ""))
+                               for exp in experience or [] if isinstance(exp, dict)) if span]
+    spans.sort(key=lambda span: span[0])
+    closed = 0.0
+    current: Optional[List[Optional[float]]] = None
+    for start, end in spans:
+        if current is None or (current[1] is not None and start > current[1]):
+            if current is not None:
+                closed += current[1] - current[0]
+            current = [start, end]
+        elif current[1] is not None:
+            current[1] = None if end is None else max(current[1], end)
+    if current is None:
+        return 0.0, None
+    if current[1] is None:
+        return closed, current[0]
+    return closed + current[1] - current[0], None
+
+
+def _fractional_year(day: datetime.date) -> float:
+    return day.year + (day.month - 1) / 12
+
+
+def filterable_metadata(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Metadata fields derived at ingest time so searches can filter on them
+
+    Chroma metadata values must be scalars, so skills, location parts and
+    title words are stored as boolean flags ("skill_python", "loc_india",
+    "title_developer") that a where clause can match exactly.
+
+    Experience is stored without reference to today's date, so the metadata
+    (and the content hash built from it) only changes when the profile does:
+    a profile whose roles have all ended stores years_experience, while one
+    with an ongoing role stores experience_since, the date its experience
+    would have started had it been continuous (years = now - experience_since).
+
+    Args:
+        profile: Processed profile data dictionary
+
+    Returns:
+        Flat metadata dict with years_experience or experience_since, and
+        skill_*, loc_* and title_* keys
+    """
+    closed, ongoing_since = _experience_spans(profile.get("experience") or [])
+    metadata: Dict[str, Any]
+    if ongoing_since is None:
+        metadata = {"years_experience": round(closed, 3)}
+    else:
+        metadata = {"experience_since": round(ongoing_since - closed, 3)}
+    skills = [metadata_slug(str(skill)) for skill in profile.get("skills") or []]
+    for slug in [s for s in dict.fromkeys(skills) if s][:MAX_SKILL_FLAGS]:
+        metadata[f"skill_{slug}"] = True
+    for part in str(profile.get("location") or "").split(","):
+        slug = metadata_slug(part)
+        if slug:
+            metadata[f"loc_{slug}"] = True
+    title = str(profile.get("title") or profile.get("headline") or "")
+    for word in title_words(title)[:MAX_TITLE_FLAGS]:
+        metadata[f"title_{word}"] = True
+    return metadata
+
+
+def build_where(location: Optional[str] = None, title: Optional[str] = None,
+                skills: Optional[Sequence[str]] = None, min_years: Optional[float] = None,
+                max_years: Optional[float] = None,
+                text_contains: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Translate structured profile filters into Chroma where / where_document clauses
+
+    Args:
+        location: Place that must appear in the profile location (e.g. "India")
+        title: Words that must all appear in the title or headline, in any
+            order and case (e.g. "Python Developer" matches "Senior Python
+            Developer at Acme")
+        skills: Skills the profile must all list
+        min_years: Minimum estimated years of experience, as of today
+        max_years: Maximum estimated years of experience, as of today
+        text_contains: Substring the profile document must contain (case-sensitive)
+
+    Returns:
+        (where, where_document), each None when unused
+    """
+    conditions: List[Dict[str, Any]] = []
+    if location:
+        for part in location.split(","):
+            slug = metadata_slug(part)
+            if slug:
+                conditions.append({f"loc_{slug}": True})
+    for word in title_words(title or ""):
+        conditions.append({f"title_{word}": True})
+    for skill in skills or []:
+        slug = metadata_slug(skill)
+        if slug:
+            conditions.append({f"skill_{slug}": True})
+    # Finished careers compare years_experience directly; ongoing ones compare
+    # experience_since against today shifted by the bound
+    now = _fractional_year(datetime.date.today())
+    if min_years is not None:
+        conditions.append({"$or": [{"years_experience": {"$gte": float(min_years)}},
+                                   {"experience_since": {"$lte": round(now - float(min_years), 3)}}]})
+    if max_years is not None:
+        conditions.append({"$or": [{"years_experience": {"$lte": float(max_years)}},
+                                   {"experience_since": {"$gte": round(now - float(max_years), 3)}}]})
+
+    if not conditions:
+        where = None
+    elif len(conditions) == 1:
+        where = conditions[0]
+    else:
+        where = {"$and": conditions}
+    where_document = {"$contains": text_contains} if text_contains else None
+    return where, where_document
@@ -1,15 +1,84 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterator
+import json
 import logging
+import re
+import time
 from .vector_store import ProfileVectorStore
-from langchain_mistralai.chat_models import ChatMistralAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import StrOutputParser
-from langchain.schema.runnable import RunnablePassthrough
+from .rate_limit import get_rate_limiter
+from .llm_cache import LLMResponseCache, model_name_of
+from .metrics import llm_callbacks, metrics, record_llm_usage
+from .screening import ScreeningEngine, response_text
+from .llm_registry import get_chain, get_llm, get_prompt
 
 logger = logging.getLogger(__name__)
 
+# Bump a version whenever its prompt changes so cached answers are not reused
+STUFF_TEMPLATE_VERSION = "rag_stuff_v1"
+MAP_TEMPLATE_VERSION = "rag_map_v1"
+REDUCE_TEMPLATE_VERSION = "rag_reduce_v1"
+
+STUFF_TEMPLATE = """
+        You are an expert HR talent analyst. You need to evaluate candidates for a job role using their LinkedIn profiles.
+
+        JOB ROLE: {job_role}
+        
+        JOB DESCRIPTION:
+        {job_description}
+        
+        CANDIDATE PROFILES:
+        {formatted_docs}
+        
+        Analyze these candidates based on the job requirements and provide:
+        
+        1. Individual evaluation for each candidate (strengths, weaknesses, fit)
+        2. Comparative ranking of candidates from best to worst fit
+        3. Recommendation on whom to interview first
+        
+        Your analysis should be data-driven, focusing on relevant skills, experience, and qualifications.
+        """
+
+MAP_TEMPLATE = """You are an expert HR talent analyst. Evaluate ONE candidate for a job role.
+
+{job}
+
+CANDIDATE PROFILE:
+{profile}
+
+Respond with only a JSON object of the form:
+{{"score": <integer 1-10>, "strengths": "<one sentence>", "weaknesses": "<one sentence>", "fit": "<one sentence>"}}
+"""
+
+REDUCE_TEMPLATE = """You are an expert HR talent analyst. Candidates for a job role have already been
+evaluated individually. Using only these compact evaluations, provide:
+
+1. Comparative ranking of candidates from best to worst fit
+2. Recommendation on whom to interview first
+
+JOB ROLE: {job_role}
+
+CANDIDATE EVALUATIONS:
+{summaries}
+"""
+
+
+def parse_evaluation(text: str) -> Dict[str, Any]:
+    """Parse the JSON evaluation produced by the map step, tolerating surrounding prose"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        try:
+            evaluation = json.loads(match.group(0))
+            if isinstance(evaluation, dict):
+                return evaluation
+        except json.JSONDecodeError:
+            pass
+    # Fall back to the first number in the reply as the score
+    number = re.search(r"\b(10|[1-9])\b", text)
+    return {"score": int(number.group(1)) if number else None, "fit": text.strip()[:300]}
+
+
 class ProfileRAG:
-    def __init__(self, vector_store: ProfileVectorStore, api_key: str, model: str = "mistral/mistral-large-latest"):
+    def __init__(self, vector_store: ProfileVectorStore, api_key: str, model: str = "mistral/mistral-large-latest",
+                 cache: Optional[LLMResponseCache] = None, search_mode: str = "dense"):
         """
         Initialize the RAG system for profile analysis
         
@@ -17,11 +86,20 @@ class ProfileRAG:
             vector_store: Vector store containing profile data
             api_key: Mistral API key
             model: Mistral model to use
+            cache: Optional LLM response cache for analysis prompts
+            search_mode: Retrieval mode passed to ProfileVectorStore.search_profiles
         """
         self.vector_store = vector_store
-        self.llm = ChatMistralAI(api_key=api_key, model=model)
+        # Reuse the store's embedding service rather than loading another model
+        self.embedder = vector_store.embedder
+        self.model = model
+        self.llm = get_llm(model, api_key)
+        self.rate_limiter = get_rate_limiter("mistral")
+        self.cache = cache
+        self.search_mode = search_mode
         
-    def format_docs(self, docs: List[Dict[str, Any]]) -> str:
+    @staticmethod
+    def format_docs(docs: List[Dict[str, Any]]) -> str:
         """Format documents for context insertion"""
         formatted_docs = []
         for i, doc in enumerate(docs, 1):
@@ -37,7 +115,10 @@ class ProfileRAG:
             
         return "\n".join(formatted_docs)
         
-    def analyze_candidates(self, job_role: str, job_description: str, n_results: int = 5) -> Dict[str, Any]:
+    def analyze_candidates(self, job_role: str, job_description: str, n_results: int = 5,
+                           mode: str = "stuff", max_in_flight: int = 4,
+                           bypass_cache: bool = False,
+                           filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze candidates for a job role using RAG
         
@@ -45,59 +126,58 @@ class ProfileRAG:
             job_role: The job role to analyze
             job_description: Detailed job description
             n_results: Number of profiles to analyze
+            mode: "stuff" puts every profile into one prompt; "map_reduce"
+                evaluates each profile in its own parallel call and ranks the
+                compact results in a final call, which scales to 100+ profiles
+            max_in_flight: Concurrent map calls in "map_reduce" mode
+            bypass_cache: Ignore cached answers and query the model again
+            filters: Structured profile filters (location, title, skills,
+                min_years, max_years, text_contains) applied inside the search
             
         Returns:
-            Analysis results
+            Analysis results; in "map_reduce" mode also the per-candidate
+            evaluations and the candidates whose evaluation failed ("missing"),
+            which the analysis text names as unranked
         """
+        with metrics.timer("rag_analysis", mode=mode):
+            return self._analyze_candidates(job_role, job_description, n_results, mode, max_in_flight,
+                                            bypass_cache, filters)
+            
+    def _analyze_candidates(self, job_role: str, job_description: str, n_results: int, mode: str,
+                            max_in_flight: int, bypass_cache: bool,
+                            filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         # Construct search query
         search_query = f"{job_role} with skills matching: {job_description}"
         
         # Retrieve relevant profiles
-        profiles = self.vector_store.search_profiles(search_query, n_results=n_results)
+        profiles = self.vector_store.search_profiles(search_query, n_results=n_results, mode=self.search_mode,
+                                                     filters=filters)
         if not profiles:
             return {"error": "No matching profiles found"}
             
-        # Define RAG prompt
-        template = """
-        You are an expert HR talent analyst. You need to evaluate candidates for a job role using their LinkedIn profiles.
-
-        JOB ROLE: {job_role}
-        
-        JOB DESCRIPTION:
-        {job_description}
-        
-        CANDIDATE PROFILES:
-        {formatted_docs}
-        
-        Analyze these candidates based on the job requirements and provide:
-        
-        1. Individual evaluation for each candidate (strengths, weaknesses, fit)
-        2. Comparative ranking of candidates from best to worst fit
-        3. Recommendation on whom to interview first
-        
-        Your analysis should be data-driven, focusing on relevant skills, experience, and qualifications.
-        """
-        
-        # Create RAG chain
-        prompt = ChatPromptTemplate.from_template(template)
-        
-        # Define the RAG chain
-        rag_chain = (
-            {"job_role": lambda x: x["job_role"],
-             "job_description": lambda x: x["job_description"],
-             "formatted_docs": lambda x: self.format_docs(x["docs"])}
-            | prompt
-            | self.llm
-            | StrOutputParser()
-        )
+        if mode == "map_reduce":
+            return self._analyze_map_reduce(job_role, job_description, profiles, search_query,
+                                            max_in_flight, bypass_cache)
+        if mode != "stuff":
+            return {"error": f"Unknown analysis mode: {mode}"}
+            
+        rag_chain = self._stuff_chain()
         
         # Execute the chain
         try:
-            result = rag_chain.invoke({
+            inputs = {
                 "job_role": job_role,
                 "job_description": job_description,
                 "docs": profiles
-            })
+            }
+            result = self._cached(
+                STUFF_TEMPLATE_VERSION,
+                {"job_role": job_role, "job_description": job_description,
+                 "formatted_docs": self.format_docs(profiles)},
+                lambda: self._call_llm("rag_stuff", rag_chain.invoke, inputs,
+                                       config={"callbacks": llm_callbacks(model_name_of(self.llm), "rag_stuff")}),
+                bypass_cache
+            )
             
             return {
                 "analysis": result,
@@ -106,4 +186,161 @@ class ProfileRAG:
             }
         except Exception as e:
             logger.error(f"Error analyzing candidates: {e}")
-            return {"error": f"Analysis failed: {str(e)}"}
\ No newline at end of file
+            return {"error": f"Analysis failed: {str(e)}"}
+            
+    def stream_analysis(self, job_role: str, job_description: str, n_results: int = 5,
+                        bypass_cache: bool = False,
+                        filters: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream the single-prompt candidate analysis as it is generated
+        
+        Yields text chunks as they arrive from the model, so callers can show
+        output long before generation finishes. A cached analysis is yielded
+        as one chunk.
+        
+        Args:
+            job_role: The job role to analyze
+            job_description: Detailed job description
+            n_results: Number of profiles to analyze
+            bypass_cache: Ignore cached answers and query the model again
+            filters: Structured profile filters applied inside the search
+            
+        Yields:
+            Chunks of the analysis text
+        """
+        search_query = f"{job_role} with skills matching: {job_description}"
+        profiles = self.vector_store.search_profiles(search_query, n_results=n_results, mode=self.search_mode,
+                                                     filters=filters)
+        if not profiles:
+            logger.warning("No matching profiles found")
+            return
+            
+        cache_inputs = {"job_role": job_role, "job_description": job_description,
+                        "formatted_docs": self.format_docs(profiles)}
+        if self.cache is not None:
+            cached = self.cache.lookup(model_name_of(self.llm), STUFF_TEMPLATE_VERSION, cache_inputs, bypass_cache)
+            if cached is not None:
+                yield cached
+                return
+                
+        # Streams cannot be replayed, so only the initial request is paced
+        self.rate_limiter.bucket.acquire()
+        model = model_name_of(self.llm)
+        chunks = []
+        start = time.perf_counter()
+        try:
+            for chunk in self._stuff_chain().stream({
+                "job_role": job_role,
+                "job_description": job_description,
+                "docs": profiles
+            }, config={"callbacks": llm_callbacks(model, "rag_stream")}):
+                if not chunks:
+                    metrics.observe("llm_first_chunk_seconds", time.perf_counter() - start, model=model)
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            metrics.inc("llm_call_errors_total", model=model, operation="rag_stream")
+            logger.error(f"Error streaming candidate analysis: {e}")
+            raise
+        metrics.observe("llm_call_seconds", time.perf_counter() - start, model=model, operation="rag_stream")
+            
+        if self.cache is not None:
+            self.cache.store_response(model_name_of(self.llm), STUFF_TEMPLATE_VERSION, cache_inputs, "".join(chunks))
+            
+    def _stuff_chain(self):
+        """The single-prompt analysis chain, built once per model and shared process-wide"""
+        def build():
+            from langchain.schema import StrOutputParser
+
+            return (
+                {"job_role": lambda x: x["job_role"],
+                 "job_description": lambda x: x["job_description"],
+                 "formatted_docs": lambda x: ProfileRAG.format_docs(x["docs"])}
+                | get_prompt(STUFF_TEMPLATE)
+                | self.llm
+                | StrOutputParser()
+            )
+        # The registry keeps each client alive, so its id is a stable key
+        return get_chain(("rag_stuff", id(self.llm)), build)
+            
+    def _call_llm(self, operation: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call the model under the rate limit, recording latency and token usage"""
+        model = model_name_of(self.llm)
+        with metrics.timer("llm_call", model=model, operation=operation):
+            response = self.rate_limiter.call(fn, *args, **kwargs)
+        record_llm_usage(model, response, operation)
+        return response
+        
+    def _cached(self, template_version: str, inputs: Dict[str, Any], call: Callable[[], str], bypass: bool) -> str:
+        """Answer from the response cache when possible, otherwise call and store"""
+        if self.cache is None:
+            return call()
+        return self.cache.get_or_call(model_name_of(self.llm), template_version, inputs, call, bypass=bypass)
+            
+    def _analyze_map_reduce(self, job_role: str, job_description: str, profiles: List[Dict[str, Any]],
+                            search_query: str, max_in_flight: int, bypass_cache: bool = False) -> Dict[str, Any]:
+        """Evaluate each profile in parallel, then rank the compact evaluations in one call"""
+        job = f"JOB ROLE: {job_role}\n\nJOB DESCRIPTION:\n{job_description}"
+        candidates = [
+            {"document": self.format_docs([profile]), "metadata": profile.get("metadata", {})}
+            for profile in profiles
+        ]
+        engine = ScreeningEngine(
+            self.llm,
+            max_in_flight=max_in_flight,
+            rate_limiter=self.rate_limiter,
+            prompt_builder=lambda query, document: MAP_TEMPLATE.format(job=query, profile=document),
+            cache=self.cache,
+            template_version=MAP_TEMPLATE_VERSION,
+            bypass_cache=bypass_cache
+        )
+        
+        # Map: one short structured evaluation per candidate
+        evaluations = []
+        for result in engine.screen(job, candidates):
+            evaluation = parse_evaluation(result["score"]) if result["success"] else {"score": None}
+            evaluation.update(
+                name=result["profile"].get("name", "Unknown"),
+                url=result["profile"].get("url", ""),
+                error=result["error"]
+            )
+            evaluations.append(evaluation)
+            
+        scored = [e for e in evaluations if e.get("error") is None]
+        missing = [{"name": e["name"], "url": e["url"], "error": e["error"]} for e in evaluations
+                   if e.get("error") is not None]
+        if not scored:
+            return {"error": "Analysis failed: every candidate evaluation failed", "evaluations": evaluations,
+                    "missing": missing}
+            
+        # Reduce: rank the compact summaries instead of the full profiles
+        summaries = "\n".join(
+            f"- {e['name']} (score {e.get('score')}): strengths: {e.get('strengths', '')}; "
+            f"weaknesses: {e.get('weaknesses', '')}; fit: {e.get('fit', '')}"
+            for e in scored
+        )
+        try:
+            analysis = self._cached(
+                REDUCE_TEMPLATE_VERSION,
+                {"job_role": job_role, "summaries": summaries},
+                lambda: response_text(self._call_llm(
+                    "rag_reduce", self.llm.invoke, REDUCE_TEMPLATE.format(job_role=job_role, summaries=summaries)
+                )),
+                bypass_cache
+            )
+            if missing:
+                # The ranking only covers evaluated candidates; say who was left out
+                logger.warning(f"{len(missing)} of {len(evaluations)} candidate evaluations failed")
+                analysis += (f"\n\nNote: {len(missing)} of {len(evaluations)} candidates could not be "
+                             f"evaluated and are not ranked above: "
+                             + "; ".join(f"{m['name']} ({m['error']})" for m in missing))
+            return {
+                "analysis": analysis,
+                "evaluations": evaluations,
+                "missing": missing,
+                "profiles": profiles,
+                "query": search_query
+            }
+        except Exception as e:
+            logger.error(f"Error ranking candidates: {e}")
+            return {"error": f"Analysis failed: {str(e)}", "evaluations": evaluations, "missing": missing}
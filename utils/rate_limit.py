@@ -0,0 +1,263 @@
+import asyncio
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# A status code in an error message only counts when it is labelled as one,
+# e.g. "HTTP 429", "status code: 503" or "Error response 429 while fetching"
+_MESSAGE_STATUS_RE = re.compile(r"\b(?:http|status(?:[ _]code)?|error response)\W{0,3}([1-5]\d\d)\b", re.IGNORECASE)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Thread-safe token bucket
+
+        Args:
+            rate: Tokens added per second (the sustained request rate)
+            capacity: Maximum burst size (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available
+
+        Returns:
+            0 if the tokens were taken, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until tokens are available
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no caller proceeds for the given number of seconds"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class RetryableError(Exception):
+    """Raised by a call to request a retry, optionally with a server-provided delay"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def _status_code_of(error: BaseException) -> Optional[int]:
+    """Best-effort HTTP status of an exception raised by requests, httpx or an SDK"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status
+    # Some clients only surface the status in the message; a bare number
+    # (an ID, a token count) must not be mistaken for one
+    match = _MESSAGE_STATUS_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def _retry_after_of(error: BaseException) -> Optional[float]:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return parse_retry_after(headers.get("Retry-After"))
+
+
+class RateLimiter:
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Token bucket plus exponential backoff with jitter for one upstream
+
+        Args:
+            name: Upstream name used in logs
+            rate: Sustained requests per second allowed by the provider
+            capacity: Burst size
+            max_retries: Retries after the first attempt on 429/5xx
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.throttled = 0
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn under the rate limit, retrying on 429 and 5xx errors
+
+        fn may raise RetryableError, or any exception carrying a status code
+        (requests/httpx HTTP errors). Other exceptions propagate immediately.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = e.status_code if isinstance(e, RetryableError) else _status_code_of(e)
+                if status not in RETRYABLE_STATUS_CODES and not isinstance(e, RetryableError):
+                    raise
+                if attempt >= self.max_retries:
+                    metrics.inc("upstream_give_ups_total", upstream=self.name)
+                    logger.error(f"{self.name}: giving up after {attempt + 1} attempts: {e}")
+                    raise
+                retry_after = _retry_after_of(e)
+                delay = self.backoff_delay(attempt, retry_after)
+                self.retries += 1
+                attempt += 1
+                metrics.inc("upstream_retries_total", upstream=self.name, status=status)
+                logger.warning(f"{self.name}: status {status}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                if status == 429:
+                    # Hold back every caller sharing this upstream, not just this
+                    # one; the next acquire() blocks until the penalty has passed
+                    self.throttled += 1
+                    self.bucket.penalize(delay)
+                else:
+                    time.sleep(delay)
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Async counterpart of call() for coroutine functions such as llm.ainvoke"""
+        attempt = 0
+        while True:
+            delay = self.bucket.try_acquire()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self.bucket.try_acquire()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                status = e.status_code if isinstance(e, RetryableError) else _status_code_of(e)
+                if status not in RETRYABLE_STATUS_CODES and not isinstance(e, RetryableError):
+                    raise
+                if attempt >= self.max_retries:
+                    metrics.inc("upstream_give_ups_total", upstream=self.name)
+                    logger.error(f"{self.name}: giving up after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self.backoff_delay(attempt, _retry_after_of(e))
+                self.retries += 1
+                attempt += 1
+                metrics.inc("upstream_retries_total", upstream=self.name, status=status)
+                logger.warning(f"{self.name}: status {status}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                if status == 429:
+                    self.throttled += 1
+                    self.bucket.penalize(delay)
+                else:
+                    await asyncio.sleep(delay)
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """Decorate fn so every call goes through this limiter"""
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return self.call(fn, *args, **kwargs)
+        wrapper.__name__ = getattr(fn, "__name__", "wrapped")
+        wrapper.__doc__ = getattr(fn, "__doc__", None)
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "rate": self.bucket.rate, "retries": self.retries, "throttled": self.throttled}
+
+
+# Default quotas; override with configure_rate_limiter to match your plan
+DEFAULT_LIMITS: Dict[str, Dict[str, float]] = {
+    "rapidapi": {"rate": 5.0, "capacity": 5.0},
+    "mistral": {"rate": 1.0, "capacity": 2.0},
+}
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limiter(name: str, rate: float, capacity: Optional[float] = None, **kwargs: Any) -> RateLimiter:
+    """Create or replace the process-wide limiter for an upstream"""
+    limiter = RateLimiter(name, rate, capacity, **kwargs)
+    with _limiters_lock:
+        _limiters[name] = limiter
+    return limiter
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Return the process-wide limiter for an upstream, creating it from DEFAULT_LIMITS"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limits = DEFAULT_LIMITS.get(name, {"rate": 1.0})
+            limiter = RateLimiter(name, **limits)
+            _limiters[name] = limiter
+        return limiter
+
+
+def invoke_llm(llm: Any, prompt: Any, limiter: Optional[RateLimiter] = None, **kwargs: Any) -> Any:
+    """Call llm.invoke under the Mistral rate limit with retry on 429/5xx"""
+    limiter = limiter or get_rate_limiter("mistral")
+    return limiter.call(llm.invoke, prompt, **kwargs)
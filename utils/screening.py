@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from .llm_cache import LLMResponseCache, model_name_of
+from .metrics import metrics, record_llm_usage
+from .rate_limit import RateLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """
+    The process-wide event loop that runs all blocking-wrapper async work
+
+    Shared clients (the registry's ChatMistralAI and its httpx.AsyncClient)
+    bind their connections to the loop that first used them. A fresh
+    asyncio.run() per call closes that loop and strands the connections,
+    so every synchronous entry point runs its coroutines here instead.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-background", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion on the shared background loop
+
+    Works from plain threads and from inside another running event loop
+    (e.g. an async agent framework); code already running on the background
+    loop must await the coroutine instead.
+    """
+    loop = background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync called from the background loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def default_scoring_prompt(query: str, document: str) -> str:
+    """The scoring prompt used by main1.py/main2.py"""
+    return f"Score candidate (1-10) based on: {query}\n{document}"
+
+
+def response_text(response: Any) -> str:
+    """Text of an LLM response, whether a chat message or a plain string"""
+    content = getattr(response, "content", response)
+    return content if isinstance(content, str) else str(content)
+
+
+class ScreeningEngine:
+    def __init__(self, llm: Any, max_in_flight: int = 4, timeout: Optional[float] = 60.0,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 prompt_builder: Callable[[str, str], str] = default_scoring_prompt,
+                 cache: Optional[LLMResponseCache] = None, template_version: str = "score_v1",
+                 bypass_cache: bool = False):
+        """
+        Score candidates against a job query with bounded concurrency
+
+        Args:
+            llm: Chat model exposing ainvoke (preferred) or invoke; any object
+                with those methods works, so a fake can be injected in tests
+            max_in_flight: Maximum concurrent LLM calls
+            timeout: Per-candidate timeout in seconds (None for no limit)
+            rate_limiter: Limiter for LLM calls (defaults to the shared "mistral" one)
+            prompt_builder: Builds the scoring prompt from (query, document)
+            cache: Optional response cache for (query, document) pairs
+            template_version: Cache namespace for prompt_builder; bump it when
+                the prompt changes
+            bypass_cache: Always call the model, refreshing cached answers
+        """
+        self.llm = llm
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter("mistral")
+        self.prompt_builder = prompt_builder
+        self.cache = cache
+        self.template_version = template_version
+        self.bypass_cache = bypass_cache
+
+    async def _invoke(self, prompt: str) -> str:
+        model = model_name_of(self.llm)
+        with metrics.timer("llm_call", model=model, operation=self.template_version):
+            if hasattr(self.llm, "ainvoke"):
+                response = await self.rate_limiter.acall(self.llm.ainvoke, prompt)
+            else:
+                # Synchronous-only models run in a worker thread
+                response = await asyncio.to_thread(self.rate_limiter.call, self.llm.invoke, prompt)
+        record_llm_usage(model, response, self.template_version)
+        return response_text(response)
+
+    async def _cached_invoke(self, query: str, document: str) -> str:
+        prompt = self.prompt_builder(query, document)
+        if self.cache is None:
+            return await self._invoke(prompt)
+        return await self.cache.aget_or_call(
+            model_name_of(self.llm),
+            self.template_version,
+            {"query": query, "document": document},
+            lambda: self._invoke(prompt),
+            bypass=self.bypass_cache
+        )
+
+    async def _score(self, index: int, query: str, candidate: Dict[str, Any],
+                     semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        result = {
+            "index": index,
+            "profile": candidate.get("metadata", {}),
+            "score": None,
+            "success": False,
+            "error": None,
+            "elapsed": 0.0,
+        }
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                score = await asyncio.wait_for(
+                    self._cached_invoke(query, candidate.get("document", "")), timeout=self.timeout
+                )
+                result.update(score=score, success=True)
+            except asyncio.TimeoutError:
+                result["error"] = f"Timed out after {self.timeout}s"
+            except Exception as e:
+                result["error"] = str(e)
+            result["elapsed"] = time.perf_counter() - start
+
+        if not result["success"]:
+            name = result["profile"].get("name", f"candidate {index + 1}")
+            logger.warning(f"Screening failed for {name}: {result['error']}")
+        return result
+
+    async def ascreen(self, query: str, candidates: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score candidates concurrently
+
+        Args:
+            query: Job query or description the candidates are scored against
+            candidates: Dicts with "document" text and "metadata", as returned
+                by ProfileVectorStore.search_profiles
+
+        Returns:
+            One result per candidate, in input order, with keys "index",
+            "profile", "score", "success", "error" and "elapsed"
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        return list(await asyncio.gather(
+            *(self._score(i, query, candidate, semaphore) for i, candidate in enumerate(candidates))
+        ))
+
+    def screen(self, query: str, candidates: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Blocking wrapper around ascreen for synchronous callers"""
+        if not candidates:
+            return []
+        return run_sync(self.ascreen(query, candidates))
+
+
+def documents_to_candidates(docs: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Convert LangChain Documents into the candidate dicts ScreeningEngine expects"""
+    return [{"document": doc.page_content, "metadata": doc.metadata} for doc in docs]
@@ -1,139 +1,598 @@
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .dedup import DuplicateDetector
+from .db import DEFAULT_DB_PATH, get_chroma_client, get_collection, warm_collection
+from .embeddings import EmbeddingService, get_embedding_service
+from .metrics import SIZE_BUCKETS, metrics
+from .profile_document import build_profile_document, content_hash, reusable_embedding
+from .profile_filters import build_where, filterable_metadata
 
 logger = logging.getLogger(__name__)
 
+# Flag set on a canonical profile for every username merged into it, so a
+# re-ingested duplicate is resolved with a metadata lookup
+MERGED_FLAG_PREFIX = "merged_user_"
+
 class ProfileVectorStore:
-    def __init__(self, collection_name: str = "linkedin_profiles", persist_directory: Optional[str] = None):
+    def __init__(self, collection_name: str = "linkedin_profiles", persist_directory: Optional[str] = DEFAULT_DB_PATH,
+                 embedder: Optional[EmbeddingService] = None, hnsw: Optional[Dict[str, int]] = None,
+                 warm: bool = False, dedup: Optional[DuplicateDetector] = None,
+                 detect_duplicates: bool = True):
         """
         Initialize the vector store for profile data
         
         Args:
             collection_name: Name of the ChromaDB collection
             persist_directory: Directory to persist the database (None for in-memory)
+            embedder: Embedding service (defaults to the shared process-wide one)
+            hnsw: HNSW overrides (M, ef_construction, ef_search) used when the
+                collection is created
+            warm: Load the vector index now instead of on the first search
+            dedup: Near-duplicate detector (defaults to DuplicateDetector())
+            detect_duplicates: Merge near-duplicate profiles instead of storing them
         """
         self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        
+        # Shared per-process client for this storage path
+        self.client = get_chroma_client(persist_directory)
         
-        # Initialize ChromaDB client
-        settings = Settings(persist_directory=persist_directory) if persist_directory else Settings()
-        self.client = chromadb.Client(settings)
+        # Shared embedding model, loaded lazily on first use
+        self.embedder = embedder or get_embedding_service()
         
-        # Initialize sentence transformer model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Keyword index for hybrid search, built from the collection on first use
+        # and kept in sync on every write afterwards
+        self.bm25 = BM25Index()
+        self._bm25_ready = False
+        
+        # New profiles that duplicate a stored person are merged into it
+        self.dedup = (dedup or DuplicateDetector()) if detect_duplicates else None
         
         # Get or create collection
-        if self.collection_name in [c.name for c in self.client.list_collections()]:
-            self.collection = self.client.get_collection(name=self.collection_name)
-        else:
-            self.collection = self.client.create_collection(name=self.collection_name)
+        self.collection = get_collection(collection_name, persist_directory, hnsw)
+        self.load_stats: Optional[Dict[str, Any]] = self.warm_load() if warm else None
+        
+    def warm_load(self) -> Dict[str, Any]:
+        """Load the vector index into memory and report its size and load time"""
+        self.load_stats = warm_collection(self.collection, self.persist_directory)
+        return self.load_stats
             
     def _create_profile_document(self, profile: Dict[str, Any]) -> str:
         """Create a text document from profile data"""
-        doc = f"{profile.get('name', '')}\n{profile.get('title', '')}\n\n"
-        
-        # Add summary
-        if profile.get('summary'):
-            doc += f"Summary: {profile.get('summary')}\n\n"
-            
-        # Add experience
-        doc += "Experience:\n"
-        for exp in profile.get('experience', []):
-            doc += f"- {exp.get('title')} at {exp.get('company')}, {exp.get('date_range')}\n"
-            if exp.get('description'):
-                doc += f"  {exp.get('description')}\n"
-                
-        # Add education
-        doc += "\nEducation:\n"
-        for edu in profile.get('education', []):
-            doc += f"- {edu.get('degree')} in {edu.get('field')} from {edu.get('school')}, {edu.get('date_range')}\n"
-            
-        # Add skills
-        doc += f"\nSkills: {', '.join(profile.get('skills', []))}"
-        
-        return doc
+        return build_profile_document(profile)
+    
+    def _create_metadata(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the metadata stored alongside a profile document"""
+        metadata = {
+            "username": profile.get('username'),
+            "name": profile.get('name', ''),
+            "title": profile.get('title') or profile.get('headline', ''),
+            "location": profile.get('location', ''),
+            "url": profile.get('url') or profile.get('source_url', '')
+        }
+        # Skills, location parts and years of experience as filterable fields
+        metadata.update(filterable_metadata(profile))
+        return metadata
     
     def add_profile(self, profile: Dict[str, Any]) -> str:
         """
-        Add a profile to the vector store
+        Add or update a profile in the vector store
+        
+        Profiles whose content hash matches the stored copy are skipped
+        without re-encoding; changed profiles are re-embedded and upserted.
+        A near-duplicate of a stored profile is merged into it instead.
         
         Args:
             profile: Processed profile data dictionary
             
         Returns:
-            ID of the added document
+            ID of the stored document (the canonical one for a duplicate)
         """
         if not profile or not profile.get('username'):
             logger.warning("Cannot add invalid profile to vector store")
             return ""
             
-        username = profile.get('username')
-        document = self._create_profile_document(profile)
+        result = self._add_profile_chunk([profile])[0]
+        if result["success"]:
+            logger.info(f"Profile {result['username']} {result['status']} in vector store")
+        return result["id"]
+    
+    def add_profiles(self, profiles: Iterable[Dict[str, Any]], batch_size: int = 64) -> List[Dict[str, Any]]:
+        """
+        Add or update many profiles in the vector store in batches
         
-        # Generate embedding
-        embedding = self.model.encode(document).tolist()
+        Each chunk of profiles is checked against the stored content hashes,
+        the changed ones are encoded with a single model call and written
+        with a single collection.upsert. If a chunk write fails, its profiles
+        are retried one by one so a single bad profile does not sink the batch.
         
-        # Create metadata
-        metadata = {
-            "username": username,
-            "name": profile.get('name', ''),
-            "title": profile.get('title', ''),
-            "location": profile.get('location', ''),
-            "url": profile.get('url', '')
+        Args:
+            profiles: Iterable of processed profile data dictionaries
+            batch_size: Number of profiles encoded and written per chunk
+            
+        Returns:
+            One result per input profile, in input order, with keys
+            "username", "id", "success", "status" ("added", "updated",
+            "unchanged", "duplicate" or "failed"), "duplicate_of" and "error"
+        """
+        results: List[Dict[str, Any]] = []
+        chunk: List[Dict[str, Any]] = []
+        
+        for profile in profiles:
+            chunk.append(profile)
+            if len(chunk) >= batch_size:
+                results.extend(self._add_profile_chunk(chunk))
+                chunk = []
+        if chunk:
+            results.extend(self._add_profile_chunk(chunk))
+            
+        counts = {status: sum(1 for r in results if r["status"] == status)
+                  for status in ("added", "updated", "unchanged", "duplicate", "failed")}
+        if metrics.enabled:
+            metrics.observe("vector_store_batch_size", len(results), buckets=SIZE_BUCKETS)
+            for status, count in counts.items():
+                metrics.inc("vector_store_profiles_total", count, status=status)
+        logger.info(f"Batch ingested {len(results)} profiles: {counts}")
+        return results
+    
+    def _stored_metadata(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Metadata currently stored for the given document IDs"""
+        try:
+            existing = self.collection.get(ids=ids, include=["metadatas"])
+        except Exception as e:
+            logger.warning(f"Could not read stored profile hashes: {e}")
+            return {}
+        return {
+            doc_id: metadata or {}
+            for doc_id, metadata in zip(existing.get("ids") or [], existing.get("metadatas") or [])
         }
+    
+    def _add_profile_chunk(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Encode and upsert the changed profiles of one chunk, returning per-item results"""
+        results: List[Dict[str, Any]] = []
+        prepared: Dict[str, Dict[str, Any]] = {}
         
-        # Create document ID
-        doc_id = f"profile_{username}"
+        for profile in profiles:
+            username = profile.get('username') if isinstance(profile, dict) else None
+            result = {"username": username, "id": "", "success": False, "status": "failed",
+                      "duplicate_of": None, "error": None}
+            results.append(result)
+            if not username:
+                result["error"] = "Invalid profile: missing username"
+                continue
+            try:
+                document = self._create_profile_document(profile)
+                metadata = self._create_metadata(profile)
+            except Exception as e:
+                result["error"] = f"Could not build document: {e}"
+                continue
+            signature = None
+            if self.dedup:
+                signature = self.dedup.signature(document)
+                metadata.update(self.dedup.band_keys(signature))
+            metadata["content_hash"] = content_hash(document, metadata)
+            doc_id = f"profile_{username}"
+            if doc_id in prepared:
+                # The same profile twice in one chunk: the later copy wins
+                prepared[doc_id]["result"]["error"] = "Superseded by a later copy in the same batch"
+            prepared[doc_id] = {
+                "result": result,
+                "profile": profile,
+                "document": document,
+                "metadata": metadata,
+                "signature": signature,
+            }
+            
+        if not prepared:
+            return results
+            
+        # Skip anything whose stored content hash is unchanged
+        stored = self._stored_metadata(list(prepared))
+        changed: List[str] = []
+        for doc_id, item in prepared.items():
+            item["result"]["id"] = doc_id
+            previous = stored.get(doc_id)
+            if previous is not None and previous.get("content_hash") == item["metadata"]["content_hash"]:
+                item["result"].update(success=True, status="unchanged")
+            else:
+                item["status"] = "updated" if previous is not None else "added"
+                if previous and previous.get("merged_usernames"):
+                    # Keep the record of earlier merges across content updates
+                    item["metadata"].update({k: v for k, v in previous.items()
+                                             if k == "merged_usernames" or k.startswith(MERGED_FLAG_PREFIX)})
+                changed.append(doc_id)
+                
+        if self.dedup:
+            changed = self._drop_text_duplicates(prepared, changed)
+        if not changed:
+            return results
+            
+        # Only encode documents that did not arrive with a matching embedding
+        embeddings: Dict[str, List[float]] = {}
+        to_encode: List[str] = []
+        for doc_id in changed:
+            item = prepared[doc_id]
+            embedding = reusable_embedding(item["profile"], item["document"], self.embedder.model_name)
+            if embedding is None:
+                to_encode.append(doc_id)
+            else:
+                embeddings[doc_id] = embedding
+        if to_encode:
+            try:
+                encoded = self.embedder.encode_many([prepared[doc_id]["document"] for doc_id in to_encode])
+            except Exception as e:
+                logger.error(f"Error encoding profile batch: {e}")
+                for doc_id in changed:
+                    prepared[doc_id]["result"].update(id="", error=f"Encoding failed: {e}")
+                return results
+            embeddings.update(zip(to_encode, encoded))
+            
+        if self.dedup:
+            changed = self._drop_embedding_duplicates(prepared, changed, embeddings)
+            if not changed:
+                return results
+                
+        try:
+            with metrics.timer("chroma_upsert"):
+                self.collection.upsert(
+                    documents=[prepared[doc_id]["document"] for doc_id in changed],
+                    embeddings=[embeddings[doc_id] for doc_id in changed],
+                    metadatas=[prepared[doc_id]["metadata"] for doc_id in changed],
+                    ids=changed
+                )
+            for doc_id in changed:
+                prepared[doc_id]["result"].update(success=True, status=prepared[doc_id]["status"])
+                self._index_keywords(doc_id, prepared[doc_id]["document"])
+            return results
+        except Exception as e:
+            logger.warning(f"Batch write failed, retrying {len(changed)} profiles individually: {e}")
+            
+        # Isolate the failing profile(s) without re-encoding anything
+        for doc_id in changed:
+            item = prepared[doc_id]
+            try:
+                self.collection.upsert(
+                    documents=[item["document"]],
+                    embeddings=[embeddings[doc_id]],
+                    metadatas=[item["metadata"]],
+                    ids=[doc_id]
+                )
+                item["result"].update(success=True, status=item["status"])
+                self._index_keywords(doc_id, item["document"])
+            except Exception as e:
+                logger.error(f"Error adding profile {item['result']['username']} to vector store: {e}")
+                item["result"].update(id="", error=str(e))
+        return results
+            
+    def _merge_duplicate(self, prepared: Dict[str, Dict[str, Any]], doc_id: str, canonical: Dict[str, Any],
+                         changed: List[str]):
+        """
+        Record a new profile as a duplicate of a canonical stored or pending one
+
+        The merge is written into the canonical's pending metadata when it is
+        about to be upserted (it is in changed), and updated in the collection
+        otherwise, including when the canonical is in this batch but unchanged.
+        """
+        item = prepared[doc_id]
+        username = item["result"]["username"]
+        canonical_id = canonical["id"]
+        logger.info(f"Profile {username} duplicates {canonical_id} "
+                    f"(similarity {canonical['similarity']:.2f}); merging")
+        item["result"].update(success=True, status="duplicate", id=canonical_id, duplicate_of=canonical_id)
         
-        # Add to collection
+        pending = canonical_id in changed and prepared[canonical_id]["result"]["status"] != "duplicate"
+        if pending:
+            metadata = prepared[canonical_id]["metadata"]
+        else:
+            metadata = dict(canonical.get("metadata") or {})
+        merged = [u for u in str(metadata.get("merged_usernames") or "").split(",") if u]
+        if username not in merged:
+            merged.append(username)
+        metadata["merged_usernames"] = ",".join(merged)
+        metadata[f"{MERGED_FLAG_PREFIX}{username}"] = True
+        if not pending:
+            try:
+                self.collection.update(ids=[canonical_id], metadatas=[{
+                    "merged_usernames": metadata["merged_usernames"],
+                    f"{MERGED_FLAG_PREFIX}{username}": True,
+                }])
+            except Exception as e:
+                logger.warning(f"Could not record merge into {canonical_id}: {e}")
+                
+    def _merged_canonicals(self, usernames: List[str]) -> Dict[str, str]:
+        """Username -> stored canonical ID for usernames merged on an earlier ingest"""
+        wanted = list(dict.fromkeys(usernames))
+        if not wanted:
+            return {}
+        clauses = [{f"{MERGED_FLAG_PREFIX}{username}": True} for username in wanted]
         try:
-            self.collection.add(
-                documents=[document],
-                embeddings=[embedding],
-                metadatas=[metadata],
-                ids=[doc_id]
-            )
-            logger.info(f"Added profile {username} to vector store")
-            return doc_id
+            found = self.collection.get(where=clauses[0] if len(clauses) == 1 else {"$or": clauses},
+                                        include=["metadatas"])
         except Exception as e:
-            logger.error(f"Error adding profile {username} to vector store: {e}")
-            return ""
+            logger.warning(f"Merged username lookup failed: {e}")
+            return {}
+        canonicals: Dict[str, str] = {}
+        for canonical_id, metadata in zip(found.get("ids") or [], found.get("metadatas") or []):
+            for username in wanted:
+                if (metadata or {}).get(f"{MERGED_FLAG_PREFIX}{username}"):
+                    canonicals.setdefault(username, canonical_id)
+        return canonicals
+        
+    def _drop_text_duplicates(self, prepared: Dict[str, Dict[str, Any]], changed: List[str]) -> List[str]:
+        """
+        Merge new profiles whose MinHash bands match a stored or earlier profile
+
+        Usernames merged on an earlier ingest go straight to their canonical.
+        Stored candidates for the rest of the chunk come from a single band
+        lookup, indexed by band in memory.
+        """
+        new_ids = [doc_id for doc_id in changed if prepared[doc_id]["status"] == "added"]
+        if not new_ids:
+            return changed
+        merged_into = self._merged_canonicals([prepared[doc_id]["result"]["username"] for doc_id in new_ids])
+        lookup = [doc_id for doc_id in new_ids if prepared[doc_id]["result"]["username"] not in merged_into]
+        bands = {
+            doc_id: {k: v for k, v in prepared[doc_id]["metadata"].items() if k.startswith("lsh_band_")}
+            for doc_id in lookup
+        }
+        
+        by_band: Dict[Tuple[str, Any], List[Dict[str, Any]]] = {}
+        if lookup:
+            try:
+                found = self.collection.get(where=self.dedup.band_where(list(bands.values())),
+                                            include=["documents", "metadatas"])
+                for other, document, metadata in zip(found.get("ids") or [], found.get("documents") or [],
+                                                     found.get("metadatas") or []):
+                    stored = {"id": other, "document": document, "metadata": metadata or {}}
+                    for key, value in stored["metadata"].items():
+                        if key.startswith("lsh_band_"):
+                            by_band.setdefault((key, value), []).append(stored)
+            except Exception as e:
+                logger.warning(f"Duplicate lookup failed for {len(lookup)} profiles: {e}")
+        
+        kept: List[str] = []
+        for doc_id in changed:
+            item = prepared[doc_id]
+            if item["status"] != "added":
+                kept.append(doc_id)
+                continue
+            username = item["result"]["username"]
+            if username in merged_into:
+                # Already recorded on the canonical; nothing to compare or write
+                canonical_id = merged_into[username]
+                item["result"].update(success=True, status="duplicate", id=canonical_id, duplicate_of=canonical_id)
+                continue
+            candidates = [
+                {"id": other, "document": prepared[other]["document"], "metadata": prepared[other]["metadata"]}
+                for other in kept
+                if any(prepared[other]["metadata"].get(k) == v for k, v in bands[doc_id].items())
+            ]
+            seen = {doc_id}
+            for band in bands[doc_id].items():
+                for stored in by_band.get(band, []):
+                    if stored["id"] not in seen:
+                        seen.add(stored["id"])
+                        candidates.append(stored)
+            canonical = self.dedup.closest(item["signature"], item["metadata"], candidates)
+            if canonical:
+                self._merge_duplicate(prepared, doc_id, canonical, changed)
+            else:
+                kept.append(doc_id)
+        return kept
+        
+    def _drop_embedding_duplicates(self, prepared: Dict[str, Dict[str, Any]], changed: List[str],
+                                   embeddings: Dict[str, List[float]]) -> List[str]:
+        """Merge new profiles whose embedding nearly matches a stored or earlier profile"""
+        new_ids = [doc_id for doc_id in changed if prepared[doc_id]["status"] == "added"]
+        if not new_ids:
+            return changed
+        neighbours: Dict[str, List[Dict[str, Any]]] = {doc_id: [] for doc_id in new_ids}
+        try:
+            if self.collection.count():
+                found = self.collection.query(query_embeddings=[embeddings[doc_id] for doc_id in new_ids],
+                                              n_results=3, include=["embeddings", "metadatas"])
+                for q, doc_id in enumerate(new_ids):
+                    for i, other in enumerate(found["ids"][q]):
+                        neighbours[doc_id].append({"id": other, "embedding": found["embeddings"][q][i],
+                                                   "metadata": found["metadatas"][q][i] or {}})
+        except Exception as e:
+            logger.warning(f"Embedding duplicate lookup failed: {e}")
             
-    def search_profiles(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        kept: List[str] = []
+        for doc_id in changed:
+            item = prepared[doc_id]
+            if doc_id not in neighbours:
+                kept.append(doc_id)
+                continue
+            candidates = neighbours[doc_id] + [
+                {"id": other, "embedding": embeddings[other], "metadata": prepared[other]["metadata"]}
+                for other in kept
+            ]
+            canonical = self.dedup.closest_embedding(embeddings[doc_id], item["metadata"], candidates)
+            if canonical:
+                self._merge_duplicate(prepared, doc_id, canonical, changed)
+            else:
+                kept.append(doc_id)
+        return kept
+            
+    def _index_keywords(self, doc_id: str, document: str):
+        """Keep the BM25 index in step with a write (no-op until it has been built)"""
+        if self._bm25_ready:
+            self.bm25.add(doc_id, document)
+            
+    def _ensure_bm25(self):
+        """Build the BM25 index from every stored document on first use"""
+        if self._bm25_ready:
+            return
+        for page in self.iter_profiles(include_embeddings=False):
+            for profile in page:
+                self.bm25.add(profile["id"], profile["document"] or "")
+        self._bm25_ready = True
+        logger.info(f"Built BM25 index over {len(self.bm25)} profiles")
+            
+    def _dense_search(self, query: str, n_results: int, where: Optional[Dict[str, Any]] = None,
+                      where_document: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return self._dense_search_many([query], n_results, where, where_document)[0]
+        
+    def _dense_search_many(self, queries: List[str], n_results: int, where: Optional[Dict[str, Any]] = None,
+                           where_document: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        query_embeddings = self.embedder.encode_many(queries)
+        with metrics.timer("chroma_query"):
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                where_document=where_document
+            )
+        
+        if not results or 'documents' not in results or not results['documents']:
+            return [[] for _ in queries]
+            
+        grouped = []
+        for q, docs in enumerate(results['documents']):
+            matches = []
+            for i, doc in enumerate(docs):
+                matches.append({
+                    "document": doc,
+                    "metadata": results['metadatas'][q][i] if results.get('metadatas') else {},
+                    "id": results['ids'][q][i] if results.get('ids') else f"result_{i}"
+                })
+            grouped.append(matches)
+        return grouped
+        
+    def _fetch_by_ids(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        found = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return {
+            doc_id: {"document": found["documents"][i], "metadata": found["metadatas"][i] or {}, "id": doc_id}
+            for i, doc_id in enumerate(found.get("ids") or [])
+        }
+            
+    def search_profiles(self, query: str, n_results: int = 5, mode: str = "dense",
+                        candidates: Optional[int] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Search for profiles matching a query
         
         Args:
             query: Search query
             n_results: Number of results to return
+            mode: "dense" (embedding similarity), "bm25" (keyword) or "hybrid"
+                (both rankings fused with reciprocal rank fusion)
+            candidates: Results taken from each ranking before fusion
+                (defaults to 4 * n_results)
+            filters: Structured filters pushed down into the Chroma query:
+                location, title, skills, min_years, max_years, text_contains
+                (see profile_filters.build_where)
             
         Returns:
             List of matching profile documents
         """
-        query_embedding = self.model.encode(query).tolist()
+        with metrics.timer("vector_search", mode=mode):
+            matches = self._search_profiles(query, n_results, mode, candidates, filters)
+        metrics.observe("vector_search_results", len(matches), buckets=SIZE_BUCKETS, mode=mode)
+        return matches
         
+    def _search_profiles(self, query: str, n_results: int, mode: str, candidates: Optional[int],
+                         filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
         try:
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results
-            )
-            
-            if not results or 'documents' not in results or not results['documents']:
-                logger.warning("No profiles found matching the query")
+            where, where_document = build_where(**(filters or {}))
+            if mode == "dense":
+                matches = self._dense_search(query, n_results, where, where_document)
+            elif mode in ("bm25", "hybrid"):
+                self._ensure_bm25()
+                depth = candidates or 4 * n_results
+                if where or where_document:
+                    # Let Chroma resolve the filter, then rank only the survivors
+                    allowed = set(self.collection.get(where=where, where_document=where_document,
+                                                      include=[]).get("ids") or [])
+                    keyword_ranking = [doc_id for doc_id, _ in self.bm25.search(query, len(self.bm25))
+                                       if doc_id in allowed][:depth]
+                else:
+                    keyword_ranking = [doc_id for doc_id, _ in self.bm25.search(query, depth)]
+                if mode == "bm25":
+                    ranked = keyword_ranking[:n_results]
+                    dense = []
+                else:
+                    dense = self._dense_search(query, depth, where, where_document)
+                    fused = reciprocal_rank_fusion([[m["id"] for m in dense], keyword_ranking])
+                    ranked = [doc_id for doc_id, _ in fused[:n_results]]
+                    
+                # Dense hits already carry their documents; fetch only the rest
+                known = {m["id"]: m for m in dense}
+                known.update(self._fetch_by_ids([doc_id for doc_id in ranked if doc_id not in known]))
+                matches = [known[doc_id] for doc_id in ranked if doc_id in known]
+            else:
+                logger.error(f"Unknown search mode: {mode}")
                 return []
                 
-            matches = []
-            for i, doc in enumerate(results['documents'][0]):
-                matches.append({
-                    "document": doc,
-                    "metadata": results['metadatas'][0][i] if 'metadatas' in results else {},
-                    "id": results['ids'][0][i] if 'ids' in results else f"result_{i}"
-                })
-            
+            if not matches:
+                logger.warning("No profiles found matching the query")
             return matches
         except Exception as e:
             logger.error(f"Error searching profiles: {e}")
-            return []
\ No newline at end of file
+            return []
+            
+    def search_profiles_many(self, queries: List[str], n_results: int = 5,
+                             filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for profiles matching many queries at once
+        
+        All queries are encoded in one batch and sent as a single Chroma
+        query, which is far cheaper than one search_profiles call per query
+        when matching many job descriptions.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            filters: Structured filters applied to every query (see search_profiles)
+            
+        Returns:
+            One list of matching profile documents per query, in query order
+        """
+        if not queries:
+            return []
+        metrics.observe("vector_search_many_queries", len(queries), buckets=SIZE_BUCKETS)
+        try:
+            where, where_document = build_where(**(filters or {}))
+            with metrics.timer("vector_search", mode="dense_many"):
+                return self._dense_search_many(list(queries), n_results, where, where_document)
+        except Exception as e:
+            logger.error(f"Error searching profiles: {e}")
+            return [[] for _ in queries]
+            
+    def iter_profiles(self, batch_size: int = 1000, include_embeddings: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Page through every stored profile
+        
+        Args:
+            batch_size: Profiles fetched per page
+            include_embeddings: Also return the stored embedding of each profile
+            
+        Yields:
+            Lists of profile dicts with "id", "document", "metadata" and
+            (optionally) "embedding"
+        """
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        offset = 0
+        while True:
+            page = self.collection.get(include=include, limit=batch_size, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                return
+            embeddings = page.get("embeddings") if include_embeddings else None
+            yield [
+                {
+                    "id": doc_id,
+                    "document": page["documents"][i],
+                    "metadata": page["metadatas"][i] or {},
+                    **({"embedding": embeddings[i]} if embeddings is not None else {})
+                }
+                for i, doc_id in enumerate(ids)
+            ]
+            if len(ids) < batch_size:
+                return
+            offset += batch_size